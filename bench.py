@@ -0,0 +1,617 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import main
+from main import MovieSummary, Show, ShowEvent, ShowVenue, iter_shows, merge_summaries, parse_job, parse_showtimes
+
+BASELINE = "bench_baseline.json"
+REGRESSION = 1.25  # default --tolerance: slower than baseline by more than this fails the run
+
+# ---------------- SYNTHETIC DATA ----------------
+CHAINS = ["PVR", "INOX", "Cinepolis", "Miraj", "Movietime", "Unknown"]
+
+
+def synthetic_dataset(num_venues=3000, num_movies=50, num_cities=1173, seed=1):
+    rng = random.Random(seed)
+    movies = [ShowEvent(f"Movie {m} [2D | Hindi]", f"Movie {m}", f"EG{m}", f"ET{m}", "2D", "Hindi") for m in range(num_movies)]
+    venues_info = {}
+    all_data = {}
+
+    for v in range(num_venues):
+        vcode = f"V{v:05d}"
+        city = rng.randrange(num_cities)
+        venues_info[vcode] = {"City": f"City {city}", "State": f"State {city % 36}"}
+        place = ShowVenue(vcode, f"Venue {v}", "", rng.choice(CHAINS))
+
+        all_data[vcode] = {}
+        for e, event in enumerate(rng.sample(movies, rng.randint(5, 30))):
+            shows = []
+            for s in range(rng.randint(1, 6)):
+                total = rng.randint(80, 300)
+                sold = rng.randint(0, total)
+                paise = sold * rng.choice([12000, 18000, 25000])
+                shows.append(Show(place, event, "09:00 PM", f"{v}-{e}-{s}", "", total, sold, total - sold, paise))
+            all_data[vcode][event.movie] = shows
+
+    return all_data, venues_info
+
+
+def multiplex_payload(
+    venue_code="MPLX", date_code=20250905, screens=12, movies=25, formats=3, max_categories=5, seed=1
+):
+    # byvenue-shaped body for a large multiplex: every movie in a few formats
+    # across the day, with the per-category detail the API sends. screens,
+    # movies, formats (<= 5) and max_categories scale the body.
+    rng = random.Random(seed)
+    events = []
+    for m in range(movies):
+        children = []
+        for fmt, (dimension, language) in enumerate(rng.sample(
+            [("2D", "Hindi"), ("3D", "Hindi"), ("2D", "Telugu"), ("IMAX 2D", "English"), ("4DX", "Hindi")], formats
+        )):
+            shows = []
+            for s in range(rng.randint(screens // 2, screens)):
+                categories = [
+                    {
+                        "PriceCode": f"{c:04d}",
+                        "PriceDesc": rng.choice(["Recliner", "Prime", "Classic"]),
+                        "MaxSeats": str(rng.randint(20, 180)),
+                        "SeatsAvail": str(rng.randint(0, 20)),
+                        "CurPrice": f"{rng.choice([150, 220, 350, 600])}.00",
+                        "AreaCatCode": f"{c:04d}",
+                        "SeatLayout": "Y",
+                        "BestAvailableSeats": "0",
+                    }
+                    for c in range(rng.randint(min(2, max_categories), max_categories))
+                ]
+                shows.append(
+                    {
+                        "ShowTime": f"{rng.randint(1, 12):02d}:{rng.choice(['00', '15', '30', '45'])} PM",
+                        "ShowDateTime": f"{date_code}1530",
+                        "SessionId": f"{m:03d}{fmt}{s:03d}",  # unique within the venue, like the API's
+                        "Attributes": f"AUDI {s + 1}",
+                        "MinPrice": "150.00",
+                        "MaxPrice": "600.00",
+                        "Categories": categories,
+                    }
+                )
+            children.append(
+                {
+                    "EventCode": f"ET{m:05d}{dimension}",
+                    "EventDimension": dimension,
+                    "EventLanguage": language,
+                    "EventCensor": "UA",
+                    "EventDuration": "2 hrs 35 mins",
+                    "EventImageCode": f"movie-{m}",
+                    "ShowTimes": shows,
+                }
+            )
+        events.append(
+            {
+                "EventTitle": f"Movie {m}",
+                "EventGroup": f"EG{m:05d}",
+                "EventSynopsis": "x" * 400,
+                "ChildEvents": children,
+            }
+        )
+    return json.dumps(
+        {
+            "ShowDetails": [
+                {
+                    "Date": str(date_code),
+                    "Venues": {
+                        "VenueName": f"Synthetic Multiplex {venue_code}",
+                        "VenueAdd": "Somewhere",
+                        "VenueCompName": "PVR",
+                    },
+                    "Event": events,
+                }
+            ]
+        }
+    ).encode()
+
+
+def write_fixtures(root, num_venues=300, date_code=20250905, seed=1, **scale):
+    # a --replay directory of synthetic venues plus the registry entries for
+    # them; sizes vary from single screens to multiplexes
+    rng = random.Random(seed)
+    venues = {}
+    for v in range(num_venues):
+        vcode = f"SYN{v:05d}"
+        city = rng.randrange(40)
+        venues[vcode] = {
+            "VenueName": f"Synthetic {v}",
+            "City": f"City {city}",
+            "State": f"State {city % 12}",
+            "Latitude": str(8 + rng.random() * 25),
+            "Longitude": str(68 + rng.random() * 28),
+        }
+        size = {"screens": rng.randint(1, 12), "movies": rng.randint(2, 20), **scale}
+        body = multiplex_payload(vcode, date_code, seed=seed * 100003 + v, **size)
+        main.save_fixture(root, vcode, date_code, body)
+    return venues
+
+
+# ---------------- BASELINE ----------------
+def legacy_aggregate(all_data, venues_info):
+    # the pre-MovieSummary dump_progress loop: city/chain buckets found by
+    # scanning the per-movie lists
+    movie_summary = {}
+    for vcode, movies in all_data.items():
+        venue_meta = venues_info.get(vcode, {})
+        city = venue_meta.get("City", "Unknown")
+        state = venue_meta.get("State", "Unknown")
+
+        for movie, shows in movies.items():
+            if movie not in movie_summary:
+                movie_summary[movie] = {
+                    "shows": 0, "gross": 0.0, "sold": 0, "totalSeats": 0,
+                    "venues": 0, "cities": 0, "fastfilling": 0, "housefull": 0,
+                    "details": [], "Chain_details": [],
+                }
+            data = movie_summary[movie]
+            data["venues"] += 1
+
+            city_block = None
+            for d in data["details"]:
+                if d["city"] == city and d["state"] == state:
+                    city_block = d
+                    break
+            if city_block is None:
+                city_block = {"city": city, "state": state, "venues": 0, "shows": 0,
+                              "gross": 0.0, "sold": 0, "totalSeats": 0,
+                              "fastfilling": 0, "housefull": 0}
+                data["details"].append(city_block)
+                data["cities"] += 1
+            city_block["venues"] += 1
+
+            chain = shows[0].chain
+            chain_block = None
+            for d in data["Chain_details"]:
+                if d["chain"] == chain:
+                    chain_block = d
+                    break
+            if chain_block is None:
+                chain_block = {"chain": chain, "venues": 0, "shows": 0, "gross": 0.0,
+                               "sold": 0, "totalSeats": 0, "fastfilling": 0,
+                               "housefull": 0}
+                data["Chain_details"].append(chain_block)
+            chain_block["venues"] += 1
+
+            for block in (data, city_block, chain_block):
+                for show in shows:
+                    sold, total = show.sold, show.total
+                    occ = (sold / total * 100) if total > 0 else 0
+                    block["shows"] += 1
+                    block["gross"] += show.gross
+                    block["sold"] += sold
+                    block["totalSeats"] += total
+                    if 50 <= occ < 98:
+                        block["fastfilling"] += 1
+                    elif occ >= 98:
+                        block["housefull"] += 1
+    return movie_summary
+
+
+def keyed_aggregate(all_data, venues_info):
+    summary = MovieSummary()
+    for vcode, movies in all_data.items():
+        venue_meta = venues_info.get(vcode, {})
+        summary.add_venue(
+            venue_meta.get("City", "Unknown"), venue_meta.get("State", "Unknown"), movies
+        )
+    return summary.to_json()
+
+
+def summary_of(all_data, venues_info, codes):
+    summary = MovieSummary()
+    for vcode in codes:
+        venue_meta = venues_info[vcode]
+        summary.add_venue(venue_meta["City"], venue_meta["State"], all_data[vcode])
+    return summary
+
+
+# ---------------- RUNNER ----------------
+def best_of(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def peak_memory(fn, *args):
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def tree_parse(venue_code, body, date_code):
+    return parse_showtimes(venue_code, main.loads(body), date_code)
+
+
+def stream_parse(venue_code, body, date_code):
+    return sum(1 for _ in iter_shows(venue_code, body, date_code))
+
+
+def bench_parsing(payload_dir=None):
+    results = {}
+    # recorded bodies (<venue>.json) if given, a synthetic multiplex otherwise
+    payloads = []
+    if payload_dir:
+        for name in sorted(os.listdir(payload_dir)):
+            with open(os.path.join(payload_dir, name), "rb") as f:
+                payloads.append((os.path.splitext(name)[0], f.read()))
+    else:
+        payloads.append(("MPLX", multiplex_payload()))
+        payloads.append(("MPLX-XL", multiplex_payload(screens=16, movies=60)))
+
+    for venue_code, body in payloads:
+        date_code = json.loads(body)["ShowDetails"][0]["Date"]
+        print(f"📊 Parsing {venue_code}: {len(body) / 1024:.0f} KiB")
+        for label, fn in (("tree", tree_parse), ("stream", stream_parse)):
+            took = best_of(fn, venue_code, body, date_code)
+            peak = peak_memory(fn, venue_code, body, date_code)
+            print(f"  {label:<6}: {took * 1000:8.1f} ms, peak {peak / 1024:8.0f} KiB")
+            results[f"parse.{label}.{venue_code}"] = took
+    return results
+
+
+def parse_all(bodies, workers):
+    dates = (20250905,)
+    jobs = [(f"V{i:05d}", 20250905, body, dates, "City", "State") for i, body in enumerate(bodies)]
+    if not workers:
+        return merge_summaries(r[1][0][2] for r in (parse_job(*job) for job in jobs))
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return merge_summaries(r[1][0][2] for r in pool.map(parse_job, *zip(*jobs), chunksize=4))
+
+
+def bench_parse_pool(num_bodies=64):
+    # parse + per-venue rollups, in process vs across --parse-workers
+    bodies = [multiplex_payload(seed=s) for s in range(num_bodies)]
+    print(f"📊 Parse pool: {num_bodies} multiplex bodies, {os.cpu_count()} CPUs")
+    inline = best_of(parse_all, bodies, 0, repeat=1)
+    print(f"  inline      : {inline * 1000:8.1f} ms")
+    results = {"parse_pool.inline": inline}
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        took = best_of(parse_all, bodies, workers, repeat=1)
+        print(f"  {workers:>2} workers  : {took * 1000:8.1f} ms  ({inline / took:.1f}x)")
+        results[f"parse_pool.{workers}"] = took
+        workers *= 2
+    return results
+
+
+def bench_aggregation():
+    all_data, venues_info = synthetic_dataset()
+    shows = sum(len(s) for movies in all_data.values() for s in movies.values())
+    print(f"📊 Aggregation: {len(all_data)} venues, {shows} shows")
+
+    legacy = best_of(legacy_aggregate, all_data, venues_info)
+    keyed = best_of(keyed_aggregate, all_data, venues_info)
+    print(f"  linear scan : {legacy * 1000:8.1f} ms")
+    print(f"  keyed dicts : {keyed * 1000:8.1f} ms  ({legacy / keyed:.1f}x)")
+    return {"aggregate.legacy": legacy, "aggregate.keyed": keyed}
+
+
+def sweep_once(fixtures, venues, date_code, latency):
+    # one thread-engine sweep over ReplayTransport into a scratch state dir
+    registry = main.VenueRegistry.from_venues(venues)
+    with tempfile.TemporaryDirectory() as state_dir, contextlib.redirect_stdout(io.StringIO()):
+        main.transport = main.ReplayTransport(fixtures, latency)
+        main.limiter = main.TokenBucket(0)
+        main.cache = None
+        main.checkpoints = {date_code: main.CheckpointWriter(registry, date_code, state_dir)}
+        main.run_thread_sweep([(vcode, date_code) for vcode in registry])
+        main.checkpoints[date_code].close()
+        main.checkpoints = {}
+
+
+def bench_sweep(num_venues=300, latency=0.005):
+    # end to end: fetch (simulated latency), parse, aggregate and checkpoint
+    main.set_verbose(False)
+    with tempfile.TemporaryDirectory() as fixtures:
+        venues = write_fixtures(fixtures, num_venues)
+        took = best_of(sweep_once, fixtures, venues, 20250905, latency, repeat=1)
+    print(f"📊 Sweep: {num_venues} venues, {latency * 1000:.0f} ms simulated latency")
+    print(f"  threads     : {took * 1000:8.1f} ms  ({num_venues / took:.0f} venues/s)")
+    return {"sweep.threads": took}
+
+
+def gross_reached_at(order, gross, share=0.95):
+    # fraction of the sweep done when the running gross first reaches share
+    target, running = share * sum(gross.values()), 0.0
+    for done, code in enumerate(order, 1):
+        running += gross[code]
+        if running >= target:
+            return done / len(order)
+    return 1.0
+
+
+def bench_schedule(num_venues=300, known=0.8, seed=3):
+    # how early a partial summary is representative: last run's gross, off
+    # by up to +-50% and missing for 1 - known of the venues, against this one
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as fixtures:
+        venues = write_fixtures(fixtures, num_venues)
+        gross = {}
+        for vcode in venues:
+            with open(main.fixture_path(fixtures, vcode, 20250905), "rb") as f:
+                movies = parse_showtimes(vcode, json.loads(f.read()), 20250905)
+            gross[vcode] = sum(show.gross for shows in movies.values() for show in shows)
+    stats = main.VenueStats()
+    for vcode, g in gross.items():
+        if rng.random() < known:
+            stats.venues[vcode] = [g * rng.uniform(0.5, 1.5), 0]
+    registry = main.VenueRegistry.from_venues(venues)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scheduled = main.schedule_venues(registry, list(registry), stats)
+    file_order = gross_reached_at(list(registry), gross)
+    by_gross = gross_reached_at(scheduled, gross)
+    print(f"📊 Schedule: sweep done when 95% of gross is in ({num_venues} venues, {known:.0%} with history)")
+    print(f"  file order  : {file_order:8.1%}")
+    print(f"  by gross    : {by_gross:8.1%}")
+    return {"schedule.gross95": by_gross}
+
+
+def bench_velocity(num_venues=2000, sessions=50, polls=12, seed=5):
+    # SalesSeries at scale: polls of num_venues x sessions, then the velocity
+    # engine over all of them
+    rng = random.Random(seed)
+    date_code = int(main.datetime.now(main.IST).strftime("%Y%m%d"))
+    events = [ShowEvent(f"Movie {m}", f"Movie {m}", "", "", "2D", "Hindi") for m in range(60)]
+    venues = []
+    for v in range(num_venues):
+        place = ShowVenue(f"V{v:05d}", "", "", rng.choice(CHAINS))
+        shows = []
+        for s in range(sessions):
+            total = rng.randint(80, 300)
+            show_time = f"{rng.randint(9, 11)}:{rng.choice(['00', '30'])} PM"
+            shows.append(Show(place, rng.choice(events), show_time, str(s), "", total, 0, total, 0))
+        venues.append((f"V{v:05d}", f"City {v % 300}", f"State {v % 36}", {"all": shows}))
+
+    series = main.SalesSeries(date_code)
+    started, fetched_at = time.perf_counter(), time.time()
+    for poll in range(polls):
+        for vcode, city, state, movies in venues:
+            for show in movies["all"]:
+                show.sold = min(show.total, show.sold + rng.randrange(4))
+                show.paise = show.sold * 20000
+            series.observe(vcode, city, state, movies, fetched_at + poll * 600)
+    observe = (time.perf_counter() - started) / polls
+    print(
+        f"📊 Velocity: {len(series)} sessions x {polls} polls, "
+        f"{len(series.snapshots['sid'])} snapshots"
+    )
+    print(f"  observe     : {observe * 1000:8.1f} ms per poll of every venue")
+    results = {"velocity.observe": observe}
+    for group in series.GROUPS:
+        took = best_of(series.velocity, group)
+        print(f"  {group:<12}: {took * 1000:8.1f} ms")
+        results[f"velocity.{group}"] = took
+    return results
+
+
+# the per-show dict fetch_data used to build, for the memory comparison
+LEGACY_FIELDS = (
+    "venue_code", "venue", "address", "chain", "movie", "title", "parent_event_code",
+    "child_event_code", "dimension", "language", "time", "session_id", "audi",
+    "total", "sold", "available", "occupancy", "gross",
+)
+
+
+def peak_rss():
+    # KiB. VmHWM where there is one: ru_maxrss carries the parent's peak
+    # across the spawn's exec, which hides everything below it
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def hold_sweep(fixtures, venue_codes, date_code, as_dicts):
+    # runs in a fresh process: parse every fixture and keep all of it, the
+    # way a poll keeps every venue's shows; KiB of peak RSS added
+    before = peak_rss()
+    all_data = {}
+    for vcode in venue_codes:
+        with open(main.fixture_path(fixtures, vcode, date_code), "rb") as f:
+            movies = main.parse_body(vcode, f.read(), date_code)
+        if as_dicts:
+            movies = {
+                movie: [{name: getattr(show, name) for name in LEGACY_FIELDS} for show in shows]
+                for movie, shows in movies.items()
+            }
+        all_data[vcode] = movies
+    shows = sum(len(s) for movies in all_data.values() for s in movies.values())
+    return shows, peak_rss() - before
+
+
+def bench_memory(num_venues=1000):
+    # peak RSS of a full sweep replay's show records: 18-key dicts as before,
+    # slotted Show records now
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as fixtures:
+        venues = write_fixtures(fixtures, num_venues)
+        peaks = {}
+        for label, as_dicts in (("dicts", True), ("slotted", False)):
+            with ProcessPoolExecutor(1, mp_context=context) as pool:
+                shows, peaks[label] = pool.submit(hold_sweep, fixtures, list(venues), 20250905, as_dicts).result()
+    print(f"📊 Memory: {num_venues} venues, {shows} shows held")
+    for label, peak in peaks.items():
+        print(f"  {label:<12}: {peak / 1024:8.1f} MiB peak RSS  ({peak * 1024 / shows:.0f} B/show)")
+    return {f"memory.{label}": peak for label, peak in peaks.items()}
+
+
+def bench_api():
+    # read API: rebuilding a date's views from a full summary, then a page
+    all_data, venues_info = synthetic_dataset()
+    summary = summary_of(all_data, venues_info, list(all_data))
+    build = best_of(main.SummaryViews, 20250905, 1, summary)
+    views = main.SummaryViews(20250905, 1, summary)
+    page = best_of(views.page, "cities", "occupancy", "asc", 100, 50)
+    print(f"📊 Read API: {len(summary.cities)} city blocks")
+    print(f"  build views : {build * 1000:8.1f} ms")
+    print(f"  page        : {page * 1e6:8.1f} µs")
+    return {"api.build": build, "api.page": page}
+
+
+def bench_checkpoint():
+    # cost of one dump: to_json of a full date's summary plus the file swaps
+    all_data, venues_info = synthetic_dataset()
+    registry = main.VenueRegistry.from_venues(venues_info)
+    with tempfile.TemporaryDirectory() as state_dir, contextlib.redirect_stdout(io.StringIO()):
+        writer = main.CheckpointWriter(registry, 20250905, state_dir)
+        for vcode, movies in all_data.items():
+            writer.add_venue(vcode, movies)
+        took = best_of(writer.flush)
+        writer.close()
+    print(f"📊 Checkpoint: {len(all_data)} venues")
+    print(f"  flush       : {took * 1000:8.1f} ms")
+    return {"checkpoint.flush": took}
+
+
+def bench_startup(num_venues=1500):
+    # process start to first request, via run_report.json: on a fresh state
+    # dir, then resuming after half the venues are done
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = os.path.join(tmp, "fixtures")
+        venues = write_fixtures(fixtures, num_venues)
+        with open(os.path.join(tmp, "venues.json"), "w", encoding="utf-8") as f:
+            json.dump(venues, f)
+        script = os.path.abspath(main.__file__)
+
+        def run(budget):
+            cmd = [sys.executable, script, "--replay", fixtures, "--quiet", "--rps", "0", "--budget", str(budget)]
+            subprocess.run(cmd, cwd=tmp, check=True, stdout=subprocess.DEVNULL)
+            with open(os.path.join(tmp, main.STATE_DIR, main.RUN_REPORT), encoding="utf-8") as f:
+                return json.load(f)["startup_s"]
+
+        fresh = run(num_venues // 2)
+        resumed = min(run(1) for _ in range(3))
+    print(f"📊 Startup: {num_venues} venues, time to first request")
+    print(f"  fresh       : {fresh * 1000:8.1f} ms")
+    print(f"  resumed     : {resumed * 1000:8.1f} ms")
+    return {"startup.fresh": fresh, "startup.resumed": resumed}
+
+
+def serializers():
+    # (label, encode, decode); "json indent=2" is the pre-orjson format
+    yield "json indent=2", lambda obj: json.dumps(obj, indent=2, ensure_ascii=False).encode(), json.loads
+    yield "json compact", lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(), json.loads
+    if main.orjson is not None:
+        yield "orjson compact", main.orjson.dumps, main.orjson.loads
+        yield "orjson indent=2", lambda obj: main.orjson.dumps(obj, option=main.orjson.OPT_INDENT_2), main.orjson.loads
+
+
+def bench_serialization():
+    all_data, venues_info = synthetic_dataset()
+    documents = {
+        "movie_summary": keyed_aggregate(all_data, venues_info),
+        "venues": list(all_data),
+    }
+    results = {}
+    for doc_name, doc in documents.items():
+        print(f"📊 Serializing {doc_name}.json")
+        for label, encode, decode in serializers():
+            data = encode(doc)
+            enc = best_of(encode, doc)
+            dec = best_of(decode, data)
+            print(f"  {label:<16}: encode {enc * 1000:7.1f} ms, decode {dec * 1000:7.1f} ms, {len(data) / 1024:8.0f} KiB")
+            results[f"serialize.{doc_name}.{label.replace(' ', '_')}"] = enc + dec
+
+    if not main.ARROW:
+        return results
+    table = main.ShowTable()
+    for s in range(20):
+        table.append_venue(parse_showtimes(f"V{s}", json.loads(multiplex_payload(f"V{s}", seed=s)), 20250905))
+    shows = len(table)
+    arrow = table.arrow_table(table.drain())
+    print(f"📊 Show parts: {shows} rows")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "part.parquet")
+        for codec in ("none", "snappy", "zstd", "gzip"):
+            took = best_of(lambda: main.arrow()[1].write_table(arrow, path, compression=codec))
+            print(f"  {codec:<16}: write {took * 1000:7.1f} ms, {os.path.getsize(path) / 1024:8.0f} KiB")
+            results[f"show_part.{codec}"] = took
+    return results
+
+
+def compare(results, path=BASELINE, tolerance=REGRESSION):
+    if not os.path.exists(path):
+        print(f"ℹ️ No baseline at {path}; run with --save-baseline to record one")
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"📏 Against {path} (fails above {tolerance:.2f}x):")
+    for name, took in results.items():
+        if name not in baseline:
+            continue
+        ratio = took / baseline[name]
+        flag = "  ⚠️ regression" if ratio > tolerance else ""
+        print(f"  {name:<28} {ratio:5.2f}x{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bms-render benchmarks")
+    parser.add_argument("--payloads", help="directory of recorded byvenue bodies")
+    parser.add_argument("--fixtures", metavar="DIR", help="write synthetic --replay fixtures to DIR and exit")
+    parser.add_argument("--venues", type=int, default=300, help="venues for --fixtures and the sweep")
+    parser.add_argument("--save-baseline", action="store_true", help=f"record this run as {BASELINE}")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=REGRESSION,
+        help="slowdown vs the baseline that counts as a regression (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    if args.fixtures:
+        venues = write_fixtures(args.fixtures, args.venues)
+        with open(os.path.join(args.fixtures, "venues.json"), "w", encoding="utf-8") as f:
+            json.dump(venues, f, indent=2)
+        print(f"✅ {len(venues)} synthetic venues written to {args.fixtures}")
+        raise SystemExit(0)
+
+    results = {}
+    results.update(bench_aggregation())
+    results.update(bench_checkpoint())
+    results.update(bench_serialization())
+    results.update(bench_parsing(args.payloads))
+    results.update(bench_parse_pool())
+    results.update(bench_sweep(args.venues))
+    results.update(bench_velocity())
+    results.update(bench_memory())
+    results.update(bench_api())
+    results.update(bench_schedule(args.venues))
+    results.update(bench_startup())
+
+    if args.save_baseline:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline saved to {BASELINE}")
+    elif compare(results, tolerance=args.tolerance):
+        raise SystemExit(1)
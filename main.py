@@ -1,26 +1,102 @@
 import json
 import os
 import sys
+import marshal
+import multiprocessing
+import zlib
+import math
 import time
+
+STARTED = time.monotonic()  # before the heavy imports, for bms_startup_seconds
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, contextmanager
+from functools import reduce
+from operator import attrgetter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timedelta, timezone
-import cloudscraper
 import random
-import pandas as pd
-from collections import defaultdict
+import argparse
+import asyncio
+import heapq
+import queue
+import importlib.util
+try:
+    import fcntl
+except ImportError:  # not on Windows; shards there must not share a --state-dir
+    fcntl = None
+from array import array
+from collections import Counter, defaultdict, OrderedDict
+import hashlib
+import sqlite3
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from email.utils import parsedate_to_datetime
+
+try:
+    import ijson
+except ImportError:  # falls back to decoding the whole body
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # stdlib json; slower, same data
+    orjson = None
+
+# numpy and pandas (report, load_shows, sales velocity), pyarrow (show
+# parts), aiohttp (--engine async) and cloudscraper (SessionPool) together
+# cost most of a second to import, so each is imported where it is first
+# needed and a restart reaches its first request sooner
+ARROW = importlib.util.find_spec("pyarrow") is not None  # without it (or --db) show rows are not kept
+pa = pq = None
+
+
+def arrow():
+    global pa, pq
+    if pa is None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    return pa, pq
 
 # ---------------- CONFIG ----------------
-DATE_CODE = 20250905
+DATE_CODE = 20250905  # default when --dates is not given
+STATE_DIR = "state"  # checkpoints live in state/<date_code>/
 NUM_WORKERS = 5
-MAX_ERRORS = 10
+MAX_ERRORS = 10  # consecutive failures that trip the circuit breaker
+
+# retries
+MAX_ATTEMPTS = 5  # per venue, before it goes to dead_letter.json
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+BREAKER_COOLDOWN = 30  # seconds the whole pool pauses once the breaker opens
+
+# rate limit (--rps / --burst / --budget)
+RATE_LIMIT_RPS = 8.0  # requests per second across every worker; 0 disables
+RATE_LIMIT_BURST = 16
+RATE_LIMIT_FLOOR = 0.5  # throttling never slows below this
+RATE_RECOVERY_STEP = 0.05  # req/s won back per successful request
+RATE_DECREASE_INTERVAL = 5  # seconds; one rate cut per window of throttled responses
+RETRY_AFTER_MAX = 300  # cap on a server-requested pause
+REQUEST_BUDGET = 0  # network requests per run; 0 is unlimited
+
+# async engine (--engine async)
+ASYNC_START_CONCURRENCY = NUM_WORKERS
+ASYNC_MAX_CONCURRENCY = 64
+ASYNC_TARGET_LATENCY = 2.0  # seconds; above this the limit stops growing
+ASYNC_TIMEOUT = 30
+
+# session pool (--sessions)
+SESSION_POOL_SIZE = NUM_WORKERS  # cloudscraper sessions, each with its own connections
+SESSION_STATE = "sessions.json"  # cookies/clearance under the state root, one file per shard
+SESSION_WARMUP_TIMEOUT = 30
+
+# parse pool (--parse-workers)
+PARSE_WORKERS = 0  # 0 parses in the fetching threads themselves
+PARSE_QUEUE_DEPTH = 64  # bodies waiting for a parse worker before fetchers block
 
 IST = timezone(timedelta(hours=5, minutes=30))
 now = datetime.now(IST)
 
-scraper = cloudscraper.create_scraper()
-lock = threading.Lock()
-error_count = 0
+API_BASE = "https://in.bookmyshow.com"  # --api-base, e.g. a local fixture server
 
 # Example User-Agent pool
 USER_AGENTS = [
@@ -63,43 +139,929 @@ def get_headers():
 
 headers = get_headers()
 
-# ---------------- VENUES LOADER ----------------
-def load_all_venues(path="venues.json"):
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+# ---------------- METRICS ----------------
+METRICS_PORT = 0  # --metrics-port; 0 leaves the endpoint off
+PROGRESS_INTERVAL = 15  # seconds between progress lines
+RUN_REPORT = "run_report.json"  # written under the state root at the end
+VERBOSE = True  # --quiet turns off the per-venue lines
+
+
+def set_verbose(verbose):
+    global VERBOSE
+    VERBOSE = verbose
+
+
+def say(message):
+    # per-venue chatter; the progress line covers it under --quiet
+    if VERBOSE:
+        print(message)
+
+
+class Metrics:
+    """Counters, gauges and histograms for one run.
+
+    render() gives the Prometheus text format served on --metrics-port;
+    report() the summary written to run_report.json.
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+    HELP = {
+        "bms_request_seconds": "byvenue request latency",
+        "bms_parse_seconds": "time to parse one body",
+        "bms_aggregate_seconds": "time to aggregate one venue",
+        "bms_checkpoint_seconds": "time to write one checkpoint",
+        "bms_responses_total": "responses by HTTP status (error: no response)",
+        "bms_bytes_downloaded_total": "response body bytes received",
+        "bms_cache_hits_total": "bodies served from the response cache",
+        "bms_venues_total": "venue/date pairs recorded",
+        "bms_dead_letters_total": "venue/date pairs that failed every retry",
+        "bms_parse_errors_total": "200 responses whose body failed to parse",
+        "bms_queue_depth": "items waiting per queue",
+        "bms_rate_limit": "current request rate limit (req/s)",
+        "bms_throttled_total": "429/503 responses from the API",
+        "bms_requests_total": "byvenue requests sent",
+        "bms_startup_seconds": "process start to first request sent",
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = defaultdict(float)  # (name, labels) -> value
+        self.gauges = {}  # (name, labels) -> value
+        self.histograms = {}  # name -> [per-bucket counts..., +Inf count, sum]
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            self.counters[name, tuple(sorted(labels.items()))] += value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[name, tuple(sorted(labels.items()))] = value
+
+    def add(self, name, delta, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def observe(self, name, seconds):
+        with self.lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                hist = self.histograms[name] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+                    break
+            else:
+                hist[len(self.BUCKETS)] += 1
+            hist[-1] += seconds
+
+    @contextmanager
+    def timer(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def total(self, name):
+        with self.lock:
+            return sum(v for (n, _), v in self.counters.items() if n == name)
+
+    def by_label(self, name, label, values=None):
+        # {label value: value} for one counter (or gauge, given values)
+        with self.lock:
+            values = self.counters if values is None else values
+            return {
+                str(dict(labels).get(label, "")): value
+                for (n, labels), value in values.items()
+                if n == name
+            }
 
+    def quantile(self, name, q):
+        # upper bound of the bucket holding the q-th observation
+        with self.lock:
+            hist = self.histograms.get(name)
+            if hist is None:
+                return None
+            counts = hist[:-1]
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(self.BUCKETS + (float("inf"),), counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return None
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for kind, values in (("counter", self.counters), ("gauge", self.gauges)):
+                by_name = defaultdict(list)
+                for (name, labels), value in values.items():
+                    by_name[name].append((labels, value))
+                for name, series in sorted(by_name.items()):
+                    lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for labels, value in series:
+                        label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                        lines.append(f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}")
+            for name, hist in sorted(self.histograms.items()):
+                lines.append(f"# HELP {name} {self.HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip(self.BUCKETS + ("+Inf",), hist[:-1]):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum {hist[-1]}")
+                lines.append(f"{name}_count {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        elapsed = time.time() - self.started
+        venues = self.total("bms_venues_total")
+        responses = {
+            status: int(value)
+            for status, value in self.by_label("bms_responses_total", "status").items()
+        }
+        with self.lock:
+            names = list(self.histograms)
+        timings = {}
+        for name in names:
+            with self.lock:
+                hist = self.histograms[name]
+                count, total = sum(hist[:-1]), hist[-1]
+            timings[name] = {
+                "count": count,
+                "sum": round(total, 3),
+                "mean": round(total / count, 4) if count else 0.0,
+                "p50": self.quantile(name, 0.5),
+                "p95": self.quantile(name, 0.95),
+            }
+        return {
+            "started": datetime.fromtimestamp(self.started, IST).isoformat(timespec="seconds"),
+            "elapsed_s": round(elapsed, 1),
+            "venues": int(venues),
+            "venues_per_s": round(venues / elapsed, 2) if elapsed else 0.0,
+            "bytes_downloaded": int(self.total("bms_bytes_downloaded_total")),
+            "cache_hits": int(self.total("bms_cache_hits_total")),
+            "dead_letters": int(self.total("bms_dead_letters_total")),
+            "startup_s": round(self.gauges.get(("bms_startup_seconds", ()), 0), 3),
+            "responses": responses,
+            "timings": timings,
+        }
+
+
+def serve_metrics(port):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Metrics on http://127.0.0.1:{server.server_port}/metrics")
+    return server
+
+
+class ProgressLine:
+    """Prints one line of sweep progress every `interval` seconds."""
+
+    def __init__(self, total, interval=PROGRESS_INTERVAL):
+        self.total = total
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def line(self):
+        elapsed = time.time() - metrics.started
+        done = int(metrics.total("bms_venues_total"))
+        errors = sum(
+            int(value)
+            for status, value in metrics.by_label("bms_responses_total", "status").items()
+            if status not in ("200", "304")
+        )
+        depths = metrics.by_label("bms_queue_depth", "queue", metrics.gauges)
+        latency = metrics.quantile("bms_request_seconds", 0.5)
+        queues = " ".join(f"{name} {int(depth)}" for name, depth in sorted(depths.items()))
+        return (
+            f"⏱️ {done}/{self.total} venues ({done / elapsed if elapsed else 0:.1f}/s), "
+            f"{errors} errors, p50 {latency if latency is not None else '-'}s"
+            + (f", queues: {queues}" if queues else "")
+        )
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            print(self.line())
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+
+
+metrics = Metrics()
+
+# ---------------- TRANSPORT ----------------
+# Fixtures are raw byvenue bodies laid out as <dir>/<date_code>/<venue_code>.json.
+# --record saves every 200 response there; --replay answers from them instead
+# of the API (ReplayTransport for threads, serve_fixtures() for async).
+record_dir = None  # --record
+
+
+def fixture_path(root, venue_code, date_code):
+    return os.path.join(root, str(date_code), f"{venue_code}.json")
+
+
+def save_fixture(root, venue_code, date_code, body):
+    path = fixture_path(root, venue_code, date_code)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(body)
+    os.replace(f"{path}.tmp", path)
+
+
+def read_fixture(root, url):
+    # (status, body) for a showtimes URL
+    query = parse_qs(urlsplit(url).query)
+    venue_code = query.get("venueCode", [""])[0]
+    date_code = query.get("dateCode", [""])[0]
+    try:
+        with open(fixture_path(root, venue_code, date_code), "rb") as f:
+            return 200, f.read()
+    except OSError:
+        return 404, b"{}"
+
+
+class FixtureResponse:
+    def __init__(self, url, status_code, content):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {"Content-Type": "application/json"}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code} Client Error for url: {self.url}")
+
+
+class ReplayTransport:
+    """Stands in for the scraper: answers from a fixture directory, with an
+    optional fixed latency per request."""
+
+    def __init__(self, root, latency=0.0):
+        self.root = root
+        self.latency = latency
+
+    def get(self, url, headers=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return FixtureResponse(url, *read_fixture(self.root, url))
+
+
+def serve_fixtures(root, port=0, latency=0.0):
+    # local stand-in for the showtimes API, for --engine async and for
+    # anything else that wants real HTTP
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            status, body = read_fixture(root, self.path)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------- SESSION POOL ----------------
+class SessionPool:
+    """cloudscraper sessions checked out one request at a time.
+
+    A session is created (and warmed with a request to the site, which is
+    where cloudscraper solves its challenge) the first time the pool runs
+    dry, up to `size`. Each one keeps its own headers, so the User-Agent its
+    clearance was issued to goes with it. A transport error or a 403 drops
+    the session; the next checkout builds a fresh one. save() writes every
+    session's headers and cookies to `path`, and a later pool restores them
+    instead of warming up again.
+    """
+
+    def __init__(self, size=SESSION_POOL_SIZE, path=None):
+        self.size = size
+        self.path = path
+        self.idle = queue.LifoQueue()  # most recently used first, its connections are warm
+        self.live = set()
+        self.count = 0  # live sessions plus ones still warming up
+        self.lock = threading.Lock()
+        self.saved = []
+        if path is not None:
+            now_ts = time.time()
+            for state in load_json(path, {}).get("sessions", []):
+                cookies = [c for c in state["cookies"] if not c["expires"] or c["expires"] > now_ts]
+                if cookies:
+                    self.saved.append({"headers": state["headers"], "cookies": cookies})
+
+    def _create(self):
+        import cloudscraper
+
+        session = cloudscraper.create_scraper()
+        with self.lock:
+            state = self.saved.pop() if self.saved else None
+        if state is not None:
+            session.headers.update(state["headers"])
+            for c in state["cookies"]:
+                session.cookies.set(
+                    c["name"], c["value"], domain=c["domain"], path=c["path"], expires=c["expires"]
+                )
+            metrics.inc("bms_sessions_created_total", warm="restored")
+            return session
+
+        session.headers.update(get_headers())
+        try:
+            session.get(f"{API_BASE}/", timeout=SESSION_WARMUP_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ Session warm-up failed: {e}")
+        metrics.inc("bms_sessions_created_total", warm="handshake")
+        return session
+
+    def _checkout(self):
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self.lock:
+                grow = self.count < self.size
+                if grow:
+                    self.count += 1  # hold the slot while the session warms up
+            if grow:
+                return self._fill_slot()
+            try:  # a timeout, so a slot freed by a failed replacement is noticed
+                return self.idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def _fill_slot(self):
+        try:
+            session = self._create()
+        except Exception:
+            with self.lock:
+                self.count -= 1
+            raise
+        with self.lock:
+            self.live.add(session)
+        return session
+
+    def _discard(self, session):
+        # the slot stays taken; a replacement warms up in the background so
+        # the pool never shrinks
+        with self.lock:
+            self.live.discard(session)
+        session.close()
+        metrics.inc("bms_sessions_recycled_total")
+        threading.Thread(target=lambda: self.idle.put(self._fill_slot()), daemon=True).start()
+
+    def get(self, url, headers=None, **kwargs):
+        session = self._checkout()
+        try:
+            res = session.get(url, headers=headers, **kwargs)
+        except Exception:
+            self._discard(session)
+            raise
+        if res.status_code == 403:  # challenge rejected; the clearance is no good
+            self._discard(session)
+        else:
+            self.idle.put(session)
+        metrics.set("bms_sessions", self.idle.qsize(), state="idle")
+        return res
+
+    def fill(self):
+        # warm the whole pool up front, concurrently, so the sweep starts hot
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            sessions = list(executor.map(lambda _: self._checkout(), range(self.size)))
+        for session in sessions:
+            self.idle.put(session)
+        self.save()
+
+    def save(self):
+        if self.path is None:
+            return
+        with self.lock:
+            sessions = list(self.live)
+        state = {
+            "saved_at": time.time(),
+            "sessions": [
+                {
+                    "headers": dict(session.headers),
+                    "cookies": [
+                        {"name": c.name, "value": c.value, "domain": c.domain, "path": c.path, "expires": c.expires}
+                        for c in session.cookies
+                    ],
+                }
+                for session in sessions
+            ],
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        os.replace(write_json_tmp(self.path, dumps(state)), self.path)
+
+
+transport = SessionPool()  # anything with get(url, headers=...); see TRANSPORT
+
+
+# ---------------- VENUE REGISTRY ----------------
+VENUES_PATH = "venues.json"
+REGISTRY_SNAPSHOT = "venues.idx"  # dictionary-encoded column snapshot, under the --state-dir root
+GRID_DEGREES = 0.5  # lat/long cell size for the spatial index
+
+
+def load_all_venues(path=VENUES_PATH):
+    with open(path, "rb") as f:
+        return loads(f.read())
 
-def format_rgross(value):
-    if value >= 1e7:
-        return f"{round(value/1e7, 2)} Cr"
-    elif value >= 1e5:
-        return f"{round(value/1e5, 2)} L"
-    elif value >= 1e3:
-        return f"{round(value/1e3, 2)} K"
-    else:
-        return str(round(value, 2))
+
+def encode_column(values):
+    # (NUL-joined distinct values, uint16 codes) -- one split and one list
+    # comprehension to load, with repeats sharing a single string object
+    index = {}
+    codes = array("H", (index.setdefault(v, len(index)) for v in values))
+    return "\0".join(index), codes.tobytes()
+
+
+def decode_column(distinct, codes):
+    distinct = [sys.intern(v) for v in distinct.split("\0")]
+    return [distinct[i] for i in array("H", codes)]
+
+
+class VenueRegistry:
+    """venues.json loaded once into interned, column-oriented storage.
+
+    Rows are addressed by position; City, State, RegionCode, chain and a
+    GRID_DEGREES lat/long grid each map to row lists, so lookups and
+    selections are dict hits. Chains are not in venues.json and are learned
+    from the API's VenueCompName as venues are fetched.
+    """
+
+    FIELDS = (
+        "VenueName",
+        "VenueAddress",
+        "City",
+        "State",
+        "RegionCode",
+        "SubRegionCode",
+        "AvailableFormats",
+    )
+
+    def __init__(self, codes, columns, lat, lon, chains=None):
+        self.codes = codes
+        self.columns = columns
+        self.lat = lat
+        self.lon = lon
+        self.chains = chains or {}
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.snapshot = os.path.join(STATE_DIR, REGISTRY_SNAPSHOT)
+
+        self.rows = {code: row for row, code in enumerate(codes)}
+        self.indexed = False
+
+    def _build_indexes(self):
+        # deferred until the first selection; plain lookups only need rows
+        with self.lock:
+            if self.indexed:
+                return
+            columns, lat, lon = self.columns, self.lat, self.lon
+            self.by_city = defaultdict(list)
+            self.by_state = defaultdict(list)
+            self.by_region = defaultdict(list)
+            self.by_chain = defaultdict(list)
+            self.grid = defaultdict(list)
+            for row in range(len(self.codes)):
+                self.by_city[columns["City"][row]].append(row)
+                self.by_state[columns["State"][row]].append(row)
+                self.by_region[columns["RegionCode"][row]].append(row)
+                if math.isfinite(lat[row]) and math.isfinite(lon[row]):  # no coordinates
+                    self.grid[self.cell(lat[row], lon[row])].append(row)
+            for code, chain in self.chains.items():
+                if code in self.rows:
+                    self.by_chain[chain].append(self.rows[code])
+            self.indexed = True
+
+    # --- loading ---
+    @classmethod
+    def from_venues(cls, venues, chains=None):
+        codes = [sys.intern(code) for code in venues]
+        columns = {
+            field: [sys.intern(str(venues[code].get(field) or "Unknown")) for code in venues]
+            for field in cls.FIELDS
+        }
+        lat, lon = array("d"), array("d")
+        for code in venues:
+            try:
+                venue_lat = float(venues[code].get("Latitude"))
+                venue_lon = float(venues[code].get("Longitude"))
+            except (TypeError, ValueError):
+                venue_lat = venue_lon = float("nan")
+            lat.append(venue_lat)
+            lon.append(venue_lon)
+        return cls(codes, columns, lat, lon, chains)
+
+    @classmethod
+    def load(cls, path=VENUES_PATH, snapshot=os.path.join(STATE_DIR, REGISTRY_SNAPSHOT)):
+        stat = os.stat(path)
+        source = [stat.st_mtime_ns, stat.st_size]
+        if os.path.exists(snapshot):
+            try:
+                with open(snapshot, "rb") as f:
+                    snap = marshal.load(f)
+                # a snapshot whose coordinate columns differ in length came
+                # from a registry with misaligned rows: rebuild it
+                if snap["source"] == source and len(snap["lat"]) == len(snap["lon"]):
+                    registry = cls(
+                        snap["codes"].split("\0"),
+                        {
+                            field: decode_column(*encoded)
+                            for field, encoded in snap["columns"].items()
+                        },
+                        array("d", snap["lat"]),
+                        array("d", snap["lon"]),
+                        snap["chains"],
+                    )
+                    registry.snapshot = snapshot
+                    return registry
+                chains = snap.get("chains")
+            except (EOFError, ValueError, TypeError, KeyError):
+                chains = None
+        else:
+            chains = None
+
+        registry = cls.from_venues(load_all_venues(path), chains)
+        registry.save(snapshot, source)
+        return registry
+
+    def save(self, snapshot=None, source=None):
+        # to the snapshot it was loaded from unless told otherwise
+        snapshot = self.snapshot = snapshot or self.snapshot
+        if source is None:
+            stat = os.stat(VENUES_PATH)
+            source = [stat.st_mtime_ns, stat.st_size]
+        with self.lock:
+            snap = {
+                "source": source,
+                "codes": "\0".join(self.codes),
+                "columns": {
+                    field: encode_column(col) for field, col in self.columns.items()
+                },
+                "lat": self.lat.tobytes(),
+                "lon": self.lon.tobytes(),
+                "chains": dict(self.chains),
+            }
+            self.dirty = False
+        os.makedirs(os.path.dirname(snapshot) or ".", exist_ok=True)
+        with locked(snapshot):
+            # chains other shards learned since this one loaded
+            try:
+                with open(snapshot, "rb") as f:
+                    saved = marshal.load(f)
+                if saved["codes"] == snap["codes"]:
+                    snap["chains"] = {**saved["chains"], **snap["chains"]}
+            except (OSError, EOFError, ValueError, TypeError, KeyError):
+                pass
+            tmp = tmp_path(snapshot)
+            with open(tmp, "wb") as f:
+                marshal.dump(snap, f)
+            os.replace(tmp, snapshot)
+
+    def digest(self):
+        # identifies the row numbering, for files that store venues by row
+        if getattr(self, "_digest", None) is None:
+            self._digest = hashlib.blake2b("\0".join(self.codes).encode(), digest_size=16).digest()
+        return self._digest
+
+    # --- lookups ---
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return iter(self.codes)
+
+    def __contains__(self, code):
+        return code in self.rows
+
+    def field(self, code, field, default="Unknown"):
+        row = self.rows.get(code)
+        return default if row is None else self.columns[field][row]
+
+    def location(self, code):
+        row = self.rows.get(code)
+        if row is None:
+            return "Unknown", "Unknown"
+        return self.columns["City"][row], self.columns["State"][row]
+
+    def chain(self, code):
+        return self.chains.get(code, "Unknown")
+
+    def set_chain(self, code, chain):
+        if not chain or self.chains.get(code) == chain or code not in self.rows:
+            return
+        with self.lock:
+            old = self.chains.get(code)
+            self.chains[code] = sys.intern(chain)
+            if self.indexed:
+                if old is not None:
+                    self.by_chain[old].remove(self.rows[code])
+                self.by_chain[chain].append(self.rows[code])
+            self.dirty = True
+
+    # --- selections ---
+    @staticmethod
+    def cell(lat, lon):
+        return int(lat // GRID_DEGREES), int(lon // GRID_DEGREES)
+
+    def _codes(self, rows):
+        return [self.codes[row] for row in rows]
+
+    def _index(self, name):
+        if not self.indexed:
+            self._build_indexes()
+        return getattr(self, name)
+
+    def in_city(self, city):
+        return self._codes(self._index("by_city").get(city, []))
+
+    def in_state(self, state):
+        return self._codes(self._index("by_state").get(state, []))
+
+    def in_region(self, region):
+        return self._codes(self._index("by_region").get(region, []))
+
+    def in_chain(self, chain):
+        return self._codes(self._index("by_chain").get(chain, []))
+
+    def in_bbox(self, south, west, north, east):
+        # only the grid cells overlapping the box are scanned
+        (lo_y, lo_x), (hi_y, hi_x) = self.cell(south, west), self.cell(north, east)
+        grid = self._index("grid")
+        rows = []
+        for y in range(lo_y, hi_y + 1):
+            for x in range(lo_x, hi_x + 1):
+                for row in grid.get((y, x), ()):
+                    if south <= self.lat[row] <= north and west <= self.lon[row] <= east:
+                        rows.append(row)
+        return self._codes(sorted(rows))
 
 
 # ---------------- FETCH DATA ----------------
-def fetch_data(venue_code):
-    url = f"https://in.bookmyshow.com/api/v2/mobile/showtimes/byvenue?venueCode={venue_code}&dateCode={DATE_CODE}"
+def showtimes_url(venue_code, date_code=DATE_CODE):
+    return f"{API_BASE}/api/v2/mobile/showtimes/byvenue?venueCode={venue_code}&dateCode={date_code}"
+
+
+_first_request = threading.Event()
+
+
+def note_request():
+    # time from process start to the first request on the wire
+    if not _first_request.is_set():
+        _first_request.set()
+        metrics.set("bms_startup_seconds", time.monotonic() - STARTED)
+    metrics.inc("bms_requests_total")
+
+
+def fetch_payload(venue_code, date_code=DATE_CODE, skip_unchanged=False):
+    # raw response body, UNCHANGED (see ResponseCache), OVER_BUDGET or None
+    # on error
+    key = cache_key(venue_code, date_code)
+    status = None
     try:
-        res = scraper.get(url, headers=headers)
-        res.raise_for_status()
-        data = res.json()
+        if cache is not None and cache.final(key):
+            body = cache.read(key)
+            if body is not None:
+                metrics.inc("bms_cache_hits_total")
+                return UNCHANGED if skip_unchanged else body
+
+        if not limiter.acquire():
+            return OVER_BUDGET
+        note_request()
+        # identity headers belong to the pooled session; only validators here
+        req_headers = cache.validators(key) if cache is not None else {}
+        with metrics.timer("bms_request_seconds"):
+            res = transport.get(showtimes_url(venue_code, date_code), headers=req_headers)
+        status = res.status_code
+        metrics.inc("bms_responses_total", status=status)
+        metrics.inc("bms_bytes_downloaded_total", len(res.content))
+        if record_dir and status == 200:
+            save_fixture(record_dir, venue_code, date_code, res.content)
+        limiter.observe(status, res.headers.get("Retry-After"))
+        if res.status_code != 304:
+            res.raise_for_status()
+        return resolve_body(
+            key, date_code, res.status_code, res.content, res.headers, skip_unchanged
+        )
     except Exception as e:
+        if status is None:  # no response at all
+            metrics.inc("bms_responses_total", status="error")
         print(f"⚠️ Failed {venue_code}: {e}")
         return None
 
+
+def payload_date(data):
+    show_details = data.get("ShowDetails", [])
+    if not show_details:
+        return None
+    try:
+        return int(show_details[0].get("Date"))
+    except (TypeError, ValueError):
+        return None
+
+
+def body_date(body):
+    if ijson is None:
+        return payload_date(loads(body))
+    for prefix, event, value in ijson.parse(body):
+        if prefix == "ShowDetails.item.Date":
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+        if prefix == "ShowDetails.item" and event == "end_map":
+            break
+    return None
+
+
+class ShowVenue:
+    """The API's venue fields, one object per payload shared by its shows."""
+
+    __slots__ = ("venue_code", "venue", "address", "chain")
+
+    def __init__(self, venue_code, venue, address, chain):
+        self.venue_code = venue_code
+        self.venue = venue
+        self.address = address
+        self.chain = chain
+
+    def __reduce__(self):
+        return ShowVenue, (self.venue_code, self.venue, self.address, self.chain)
+
+
+class ShowEvent:
+    """A child event's fields, shared by every show of it."""
+
+    __slots__ = ("movie", "title", "parent_event_code", "child_event_code", "dimension", "language")
+
+    def __init__(self, movie, title, parent_event_code, child_event_code, dimension, language):
+        self.movie = movie
+        self.title = title
+        self.parent_event_code = parent_event_code
+        self.child_event_code = child_event_code
+        self.dimension = dimension
+        self.language = language
+
+    def __reduce__(self):
+        return ShowEvent, tuple(getattr(self, name) for name in self.__slots__)
+
+
+class Show:
+    """One show's seat counts. Venue and event fields are read through the
+    shared ShowVenue/ShowEvent; gross is held in integer paise."""
+
+    __slots__ = ("place", "event", "time", "session_id", "audi", "total", "sold", "available", "paise")
+
+    def __init__(self, place, event, time, session_id, audi, total, sold, available, paise):
+        self.place = place
+        self.event = event
+        self.time = time
+        self.session_id = session_id
+        self.audi = audi
+        self.total = total
+        self.sold = sold
+        self.available = available
+        self.paise = paise
+
+    def __reduce__(self):
+        # pickles (parse workers) share one ShowVenue/ShowEvent per payload
+        return Show, tuple(getattr(self, name) for name in self.__slots__)
+
+    @property
+    def gross(self):
+        return self.paise / 100
+
+    @property
+    def occupancy(self):
+        return round((self.sold / self.total * 100), 2) if self.total else 0
+
+
+for _name in ShowVenue.__slots__:
+    setattr(Show, _name, property(attrgetter(f"place.{_name}")))
+for _name in ShowEvent.__slots__:
+    setattr(Show, _name, property(attrgetter(f"event.{_name}")))
+del _name
+
+
+def show_venue(venue_code, venue_info):
+    return ShowVenue(
+        venue_code,
+        sys.intern(venue_info.get("VenueName") or ""),
+        sys.intern(venue_info.get("VenueAdd") or ""),
+        sys.intern(venue_info.get("VenueCompName") or "Unknown"),
+    )
+
+
+def event_shows(place, event):
+    parent_title = event.get("EventTitle") or "Unknown"
+    parent_event_code = event.get("EventGroup") or event.get("EventCode")
+
+    for child in event.get("ChildEvents", []):
+        # Dimension + Language
+        dimension = child.get("EventDimension", "").strip()
+        language = child.get("EventLanguage", "").strip()
+
+        # Clean movie title: Parent + [Dimension | Language]
+        parts = []
+        if dimension:
+            parts.append(dimension)
+        if language:
+            parts.append(language)
+        extra_info = " | ".join(parts)
+
+        if extra_info:
+            movie_title = f"{parent_title} [{extra_info}]"
+        else:
+            movie_title = parent_title
+        info = ShowEvent(
+            sys.intern(movie_title),
+            sys.intern(parent_title),
+            parent_event_code,
+            child.get("EventCode"),
+            sys.intern(dimension),
+            sys.intern(language),
+        )
+
+        for show in child.get("ShowTimes", []):
+            total = sold = available = paise = 0
+
+            for cat in show.get("Categories", []):
+                seats = int(cat.get("MaxSeats", 0))
+                avail = int(cat.get("SeatsAvail", 0))
+                price = round(float(cat.get("CurPrice", 0)) * 100)
+                total += seats
+                available += avail
+                sold += seats - avail
+                paise += (seats - avail) * price
+
+            yield Show(
+                place,
+                info,
+                sys.intern(show.get("ShowTime") or ""),
+                show.get("SessionId"),
+                sys.intern(show.get("Attributes") or ""),
+                total,
+                sold,
+                available,
+                paise,
+            )
+
+
+def skip_mismatch(venue_code, api_date, date_code):
+    if str(api_date) != str(date_code):
+        say(
+            f"⏩ Skipping summary for {venue_code} (date mismatch: {api_date} vs {date_code})"
+        )
+        return True
+    return False
+
+
+def parse_showtimes(venue_code, data, date_code=DATE_CODE):
     show_details = data.get("ShowDetails", [])
     if not show_details:
         return {}
 
     api_date = show_details[0].get("Date")
-    if str(api_date) != str(DATE_CODE):
-        print(
-            f"⏩ Skipping summary for {venue_code} (date mismatch: {api_date} vs {DATE_CODE})"
-        )
+    if skip_mismatch(venue_code, api_date, date_code):
         # Return empty dict so it's still marked as fetched
         return {}
 
@@ -108,531 +1070,2833 @@ def fetch_data(venue_code):
     if not venue_info:
         return {}
 
-    venue_name = venue_info.get("VenueName", "")
-    venue_add = venue_info.get("VenueAdd", "")
+    place = show_venue(venue_code, venue_info)
     shows_by_movie = defaultdict(list)
+    for event in show_details[0].get("Event", []):
+        for show in event_shows(place, event):
+            shows_by_movie[show.movie].append(show)
+    return shows_by_movie
 
-    # (rest of your parsing code same as before) ...
-
-    for event in data.get("ShowDetails", [{}])[0].get("Event", []):
-        parent_title = event.get("EventTitle", "Unknown")
-        parent_event_code = event.get("EventGroup") or event.get("EventCode")
-
-        for child in event.get("ChildEvents", []):
-            # Dimension + Language
-            dimension = child.get("EventDimension", "").strip()
-            language = child.get("EventLanguage", "").strip()
-            child_event_code = child.get("EventCode")
 
-            # Clean movie title: Parent + [Dimension | Language]
-            parts = []
-            if dimension:
-                parts.append(dimension)
-            if language:
-                parts.append(language)
-            extra_info = " | ".join(parts)
+# ---------------- STREAMING PARSER ----------------
+# loads() (orjson or json) is C and 2-4x cheaper than ijson on CPU, but holds
+# the whole tree; with --stream-parse, bodies at or above this size are walked
+# incrementally instead to cap peak memory (off by default)
+STREAM_PARSE_BYTES = None
+EVENT_PREFIX = "ShowDetails.item.Event.item"
+VENUE_PREFIX = "ShowDetails.item.Venues"
+EVENT_KEYS = {
+    "EventTitle", "EventGroup", "EventCode", "ChildEvents", "EventDimension",
+    "EventLanguage", "ShowTimes", "ShowTime", "SessionId", "Attributes",
+    "Categories", "MaxSeats", "SeatsAvail", "CurPrice",
+}
+VENUE_KEYS = {"VenueName", "VenueAdd", "VenueCompName"}
+
+
+class SelectiveBuilder:
+    """Builds one JSON object from ijson events, dropping every key (and its
+    whole subtree) that is not in `keep`."""
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.stack = []
+        self.key = None
+        self.skip_value = False
+        self.skip_depth = 0
+        self.value = None
+
+    def _add(self, value):
+        if not self.stack:
+            self.value = value
+        elif isinstance(self.stack[-1], dict):
+            self.stack[-1][self.key] = value
+        else:
+            self.stack[-1].append(value)
+
+    def event(self, event, value):
+        if self.skip_depth:
+            if event in ("start_map", "start_array"):
+                self.skip_depth += 1
+            elif event in ("end_map", "end_array"):
+                self.skip_depth -= 1
+            return
+        if self.skip_value:
+            self.skip_value = False
+            if event in ("start_map", "start_array"):
+                self.skip_depth = 1
+            return
 
-            if extra_info:
-                movie_title = f"{parent_title} [{extra_info}]"
+        if event == "map_key":
+            self.key = value
+            self.skip_value = value not in self.keep
+        elif event in ("start_map", "start_array"):
+            container = {} if event == "start_map" else []
+            self._add(container)
+            self.stack.append(container)
+        elif event in ("end_map", "end_array"):
+            self.stack.pop()
+        else:
+            self._add(value)
+
+
+def iter_shows(venue_code, body, date_code=DATE_CODE):
+    # Same records as parse_showtimes(), emitted one event at a time from the
+    # raw body. Only the first ShowDetails entry is read, like the tree parser.
+    if ijson is None:
+        for shows in parse_showtimes(venue_code, loads(body), date_code).values():
+            yield from shows
+        return
+
+    api_date = None
+    venue_info = None
+    place = None
+    events = []  # held back until Date and Venues have been seen
+    builder = None
+    target = None
+
+    for prefix, event, value in ijson.parse(body, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == target and event == "end_map":
+                if target == VENUE_PREFIX:
+                    venue_info = builder.value
+                else:
+                    events.append(builder.value)
+                builder = None
             else:
-                movie_title = parent_title
-
-            for show in child.get("ShowTimes", []):
-                total = sold = available = gross = 0
-
-                for cat in show.get("Categories", []):
-                    seats = int(cat.get("MaxSeats", 0))
-                    avail = int(cat.get("SeatsAvail", 0))
-                    price = float(cat.get("CurPrice", 0))
-                    total += seats
-                    available += avail
-                    sold += seats - avail
-                    gross += (seats - avail) * price
-
-                shows_by_movie[movie_title].append(
-                    {
-                        "venue_code": venue_code,
-                        "venue": venue_name,
-                        "address": venue_add,
-                        "chain": venue_info.get("VenueCompName", "Unknown"),  # NEW
-                        "movie": movie_title,
-                        "parent_event_code": parent_event_code,
-                        "child_event_code": child_event_code,
-                        "dimension": dimension,
-                        "language": language,
-                        "time": show.get("ShowTime"),
-                        "session_id": show.get("SessionId"),
-                        "audi": show.get("Attributes", ""),
-                        "total": total,
-                        "sold": sold,
-                        "available": available,
-                        "occupancy": round((sold / total * 100), 2) if total else 0,
-                        "gross": gross,
-                    }
-                )
+                continue
+        elif prefix in (EVENT_PREFIX, VENUE_PREFIX) and event == "start_map":
+            target = prefix
+            builder = SelectiveBuilder(EVENT_KEYS if prefix == EVENT_PREFIX else VENUE_KEYS)
+            builder.event(event, value)
+            continue
+        elif prefix == "ShowDetails.item.Date":
+            api_date = value
+            if skip_mismatch(venue_code, api_date, date_code):
+                return
+        elif prefix == "ShowDetails.item" and event == "end_map":
+            break
+
+        if api_date is not None and venue_info:
+            if place is None:
+                place = show_venue(venue_code, venue_info)
+            for ev in events:
+                yield from event_shows(place, ev)
+            events.clear()
+
+    if api_date is None:
+        if venue_info is not None or events:
+            skip_mismatch(venue_code, api_date, date_code)
+        return
+    if venue_info:
+        place = place or show_venue(venue_code, venue_info)
+        for ev in events:
+            yield from event_shows(place, ev)
+
+
+def set_stream_parse(threshold):
+    global STREAM_PARSE_BYTES
+    STREAM_PARSE_BYTES = threshold
+
+
+def parse_body(venue_code, body, date_code=DATE_CODE):
+    if ijson is None or STREAM_PARSE_BYTES is None or len(body) < STREAM_PARSE_BYTES:
+        return parse_showtimes(venue_code, loads(body), date_code)
+
+    shows_by_movie = defaultdict(list)
+    for show in iter_shows(venue_code, body, date_code):
+        shows_by_movie[show.movie].append(show)
     return shows_by_movie
 
 
+# ---------------- RESPONSE CACHE ----------------
+CACHE_DIR = "cache"  # raw byvenue bodies, <state root>/cache/<date_code>/<venue_code>.json
+CACHE_MAX_BYTES = 256 * 1024 * 1024
+CACHE_PAST_TTL = 24 * 3600  # past dates are final: served from disk this long, then evicted
+
+UNCHANGED = object()  # fetch_payload(..., skip_unchanged=True) on a byte-identical body
+OVER_BUDGET = object()  # fetch_payload once the run's request budget is spent
+
+
+class ResponseCache:
+    """On-disk LRU cache of raw showtimes bodies keyed by (venue, date).
+
+    Stores the ETag/Last-Modified validators and a content hash per entry so
+    unchanged responses can be detected either by a 304 or by comparing bytes.
+    """
+
+    def __init__(self, root=os.path.join(STATE_DIR, CACHE_DIR), max_bytes=CACHE_MAX_BYTES, past_ttl=CACHE_PAST_TTL):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.past_ttl = past_ttl
+        self.lock = threading.Lock()
+        self.entries = OrderedDict(load_json(os.path.join(root, "index.json"), {}))
+        self.total_bytes = sum(e["size"] for e in self.entries.values())
+        self.dirty = 0
+        self.today = int(datetime.now(IST).strftime("%Y%m%d"))
+
+        # past dates only need to live for their TTL
+        for key, entry in list(self.entries.items()):
+            if self._expired(entry):
+                self._evict(key)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.json")
+
+    def _expired(self, entry):
+        return entry["date_code"] < self.today and time.time() - entry["fetched_at"] > self.past_ttl
+
+    def _evict(self, key):
+        entry = self.entries.pop(key)
+        self.total_bytes -= entry["size"]
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def final(self, key):
+        # a past date's entry within its TTL is served without a request
+        with self.lock:
+            entry = self.entries.get(key)
+            return (
+                entry is not None
+                and entry["date_code"] < self.today
+                and not self._expired(entry)
+            )
+
+    def validators(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return {}
+        conditional = {}
+        if entry.get("etag"):
+            conditional["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            conditional["If-Modified-Since"] = entry["last_modified"]
+        return conditional
+
+    def read(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            with self.lock:
+                if key in self.entries:
+                    self._evict(key)
+            return None
+
+    def store(self, key, date_code, body, etag=None, last_modified=None):
+        # returns False when the body is byte-identical to the cached one
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry["hash"] == digest:
+                entry["fetched_at"] = time.time()
+                self.entries.move_to_end(key)
+                return False
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(body)
+        os.replace(f"{path}.tmp", path)
+
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old["size"]
+            self.entries[key] = {
+                "date_code": date_code,
+                "hash": digest,
+                "size": len(body),
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+            }
+            self.total_bytes += len(body)
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                self._evict(next(iter(self.entries)))
+            self.dirty += 1
+            save = self.dirty >= 100
+        if save:
+            self.save()
+        return True
+
+    def drop(self, key):
+        # a body that failed to parse must not be served again or count as
+        # "unchanged" on the next fetch
+        with self.lock:
+            if key in self.entries:
+                self._evict(key)
+                self.dirty += 1
+
+    def save(self):
+        with self.lock:
+            text = dumps(self.entries)
+            self.dirty = 0
+        os.makedirs(self.root, exist_ok=True)
+        index = os.path.join(self.root, "index.json")
+        os.replace(write_json_tmp(index, text), index)
+
+
+def cache_key(venue_code, date_code):
+    return f"{date_code}/{venue_code}"
+
+
+def resolve_body(key, date_code, status, body, resp_headers, skip_unchanged):
+    # shared tail of the sync and async fetch paths
+    if cache is None:
+        return body
+    if status == 304:
+        body = cache.read(key)
+        if body is None:
+            raise ValueError("304 for an entry no longer in the cache")
+        changed = False
+    else:
+        changed = cache.store(
+            key,
+            date_code,
+            body,
+            resp_headers.get("ETag"),
+            resp_headers.get("Last-Modified"),
+        )
+    if skip_unchanged and not changed:
+        return UNCHANGED
+    return body
+
+
+cache = None  # ResponseCache unless --no-cache
+
+
+# ---------------- ASYNC ENGINE ----------------
+class AdaptiveLimit:
+    """AIMD concurrency limit: +1 per window of fast successes, halved on
+    throttling (429), server errors (5xx) or transport failures."""
+
+    def __init__(
+        self,
+        start=ASYNC_START_CONCURRENCY,
+        floor=1,
+        ceiling=ASYNC_MAX_CONCURRENCY,
+        target_latency=ASYNC_TARGET_LATENCY,
+    ):
+        self.limit = float(start)
+        self.floor = floor
+        self.ceiling = ceiling
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self, latency, status):
+        async with self._cond:
+            self.in_flight -= 1
+            if status == 0 or status == 429 or status >= 500:
+                # back off at most once per target_latency so a burst of
+                # failures from one congested window only halves once
+                now_ts = time.monotonic()
+                if now_ts - self.last_decrease >= self.target_latency:
+                    self.limit = max(self.floor, self.limit / 2)
+                    self.last_decrease = now_ts
+            elif latency <= self.target_latency:
+                self.limit = min(self.ceiling, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+async def fetch_payload_async(session, venue_code, date_code):
+    key = cache_key(venue_code, date_code)
+    status = 0
+    try:
+        if cache is not None and cache.final(key):
+            body = cache.read(key)
+            if body is not None:
+                metrics.inc("bms_cache_hits_total")
+                return body, 200
+
+        if not await limiter.acquire_async():
+            return OVER_BUDGET, 0
+        note_request()
+        req_headers = headers
+        if cache is not None:
+            req_headers = {**headers, **cache.validators(key)}
+        started = time.perf_counter()
+        async with session.get(
+            showtimes_url(venue_code, date_code), headers=req_headers
+        ) as res:
+            status = res.status
+            metrics.inc("bms_responses_total", status=status)
+            limiter.observe(status, res.headers.get("Retry-After"))
+            if status != 304:
+                res.raise_for_status()
+            body = await res.read()
+            resp_headers = res.headers
+        metrics.observe("bms_request_seconds", time.perf_counter() - started)
+        metrics.inc("bms_bytes_downloaded_total", len(body))
+        if record_dir and status == 200:
+            save_fixture(record_dir, venue_code, date_code, body)
+        body = resolve_body(key, date_code, status, body, resp_headers, False)
+    except Exception as e:
+        if not status:
+            metrics.inc("bms_responses_total", status="error")
+        print(f"⚠️ Failed {venue_code}: {e}")
+        return None, status
+
+    return body, status
+
+
+async def run_async_sweep(work):
+    try:
+        import aiohttp
+    except ImportError:
+        raise SystemExit("❌ --engine async requires aiohttp (pip install aiohttp)")
+
+    limit = AdaptiveLimit()
+    connector = aiohttp.TCPConnector(
+        limit=ASYNC_MAX_CONCURRENCY, keepalive_timeout=60, ttl_dns_cache=300
+    )
+    timeout = aiohttp.ClientTimeout(total=ASYNC_TIMEOUT)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+        async def worker(venue_code, date_code):
+            for attempt in range(MAX_ATTEMPTS):
+                if checkpoints[date_code].is_fetched(venue_code):
+                    return
+                if attempt:
+                    await asyncio.sleep(retry_delay(attempt))
+                await asyncio.sleep(breaker.wait_time())
+                await limit.acquire()
+                metrics.set("bms_queue_depth", limit.in_flight, queue="in_flight")
+                started = time.monotonic()
+                data, status = await fetch_payload_async(session, venue_code, date_code)
+                await limit.release(time.monotonic() - started, status)
+                if data is OVER_BUDGET:
+                    return
+                metrics.set("bms_queue_depth", limit.in_flight, queue="in_flight")
+                if pipeline is not None:
+                    # submit() may block on a full parse queue
+                    recorded = await asyncio.to_thread(record_result, venue_code, date_code, data)
+                else:
+                    recorded = record_result(venue_code, date_code, data)
+                if recorded:
+                    return
+            checkpoints[date_code].add_dead_letter(venue_code, MAX_ATTEMPTS)
+
+        async def chain(venue_code, dates):
+            for date_code in dates:
+                await worker(venue_code, date_code)
+
+        await asyncio.gather(*(chain(vcode, dates) for vcode, dates in date_chains(work).items()))
+
+    print(f"⚙️ Async sweep finished at concurrency {int(limit.limit)}")
+
+
 # ---------------- SUMMARY ----------------
-def compile_summary(all_data, venues_info):
-    movie_stats = {}
+def new_block(**keys):
+    return {
+        **keys,
+        "venues": 0,
+        "shows": 0,
+        "gross": 0,  # paise; rupees in to_json()
+        "sold": 0,
+        "totalSeats": 0,
+        "fastfilling": 0,
+        "housefull": 0,
+    }
+
+
+COUNTERS = ("venues", "shows", "gross", "sold", "totalSeats", "fastfilling", "housefull")
+
+
+def add_shows(blocks, shows, sign=1):
+    # one pass per show updates every rollup level at once; sign=-1 takes a
+    # previously added snapshot back out
+    for show in shows:
+        sold = show.sold
+        total = show.total
+        gross = show.paise
+        occ = (sold / total * 100) if total > 0 else 0
+
+        for block in blocks:
+            block["shows"] += sign
+            block["gross"] += sign * gross
+            block["sold"] += sign * sold
+            block["totalSeats"] += sign * total
+            if occ >= 98:
+                block["housefull"] += sign
+            elif occ >= 50:
+                block["fastfilling"] += sign
+
+
+def occupancy(block):
+    if block["totalSeats"] > 0:
+        return round(block["sold"] / block["totalSeats"] * 100, 2)
+    return 0.0
+
 
-    for venue_code, movies in all_data.items():
-        venue_meta = venues_info.get(venue_code, {})
-        city = venue_meta.get("City", "Unknown")
-        state = venue_meta.get("State", "Unknown")
+class MovieSummary:
+    """Movie, city and chain rollups held in dicts keyed by movie,
+    (movie, state, city) and (movie, chain).
 
+    Only the summable COUNTERS are stored, so a summary is a partial
+    aggregate: summaries built from disjoint sets of venues merge() in any
+    order or grouping into the summary of their union, and a venue added
+    with sign=-1 cancels its earlier contribution. Gross is summed in integer
+    paise, so that holds exactly. Derived fields (cities, occupancy), rupees
+    and the list-shaped movie_summary.json layout are only built in
+    to_json().
+    """
+
+    def __init__(self):
+        self.movies = {}
+        self.cities = {}
+        self.chains = {}
+        self.meta = {}  # movie -> title/dimension/language as parsed
+
+    def add_venue(self, city, state, movies, sign=1):
         for movie, shows in movies.items():
-            if movie not in movie_stats:
-                movie_stats[movie] = {
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "totalSeats": 0,
-                    "venues": 0,
-                    "details": [],  # <-- array instead of dict
+            if not shows:
+                continue
+            chain = shows[0].chain
+
+            movie_block = self.movies.get(movie)
+            if movie_block is None:
+                movie_block = self.movies[movie] = new_block()
+                self.meta[movie] = {
+                    key: getattr(shows[0], key) for key in ("title", "dimension", "language")
                 }
 
-            # search for existing city/state bucket
-            city_obj = next(
-                (
-                    c
-                    for c in movie_stats[movie]["details"]
-                    if c["city"] == city and c["state"] == state
-                ),
-                None,
-            )
+            city_key = (movie, state, city)
+            city_block = self.cities.get(city_key)
+            if city_block is None:
+                city_block = self.cities[city_key] = new_block(city=city, state=state)
 
-            if not city_obj:
-                city_obj = {
-                    "city": city,
-                    "state": state,
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                }
-                movie_stats[movie]["details"].append(city_obj)
+            chain_key = (movie, chain)
+            chain_block = self.chains.get(chain_key)
+            if chain_block is None:
+                chain_block = self.chains[chain_key] = new_block(chain=chain)
+
+            blocks = (movie_block, city_block, chain_block)
+            for block in blocks:
+                block["venues"] += sign
+            add_shows(blocks, shows, sign)
+
+    def remove_venue(self, city, state, movies):
+        self.add_venue(city, state, movies, sign=-1)
+        self.prune()
+
+    def merge(self, other):
+        for name in ("movies", "cities", "chains"):
+            mine = getattr(self, name)
+            for key, block in getattr(other, name).items():
+                if key not in mine:
+                    mine[key] = dict(block)
+                    continue
+                target = mine[key]
+                for field in COUNTERS:
+                    target[field] += block[field]
+        for movie, meta in other.meta.items():
+            self.meta.setdefault(movie, meta)
+        return self
+
+    def prune(self):
+        # drop buckets every contributing venue has been taken back out of
+        for index in (self.movies, self.cities, self.chains):
+            for key in [key for key, block in index.items() if block["venues"] <= 0]:
+                del index[key]
+        for movie in [movie for movie in self.meta if movie not in self.movies]:
+            del self.meta[movie]
+
+    def to_json(self):
+        details = defaultdict(list)
+        for (movie, _, _), block in self.cities.items():
+            details[movie].append({**block, "gross": block["gross"] / 100, "occupancy": occupancy(block)})
+        chain_details = defaultdict(list)
+        for (movie, _), block in self.chains.items():
+            chain_details[movie].append({**block, "gross": block["gross"] / 100, "occupancy": occupancy(block)})
 
-            # add venue count once per venue
-            movie_stats[movie]["venues"] += 1
+        movie_summary = {}
+        for movie, block in self.movies.items():
+            movie_summary[movie] = {
+                **self.meta.get(movie, {}),
+                "shows": block["shows"],
+                "gross": block["gross"] / 100,
+                "sold": block["sold"],
+                "totalSeats": block["totalSeats"],
+                "venues": block["venues"],
+                "cities": len(details[movie]),
+                "fastfilling": block["fastfilling"],
+                "housefull": block["housefull"],
+                "occupancy": occupancy(block),
+                # sort city blocks by gross (high → low)
+                "details": sorted(details[movie], key=lambda x: x["gross"], reverse=True),
+                "Chain_details": chain_details[movie],
+            }
+        return movie_summary
+
+    @staticmethod
+    def _block(data, **keys):
+        block = new_block(**keys)
+        for key in block:
+            block[key] = data.get(key, block[key])
+        block["gross"] = round(block["gross"] * 100)
+        return block
+
+    @classmethod
+    def from_json(cls, movie_summary):
+        summary = cls()
+        for movie, data in movie_summary.items():
+            summary.movies[movie] = cls._block(data)
+            summary.meta[movie] = {
+                key: data[key]
+                for key in ("title", "dimension", "language")
+                if key in data
+            }
 
-            for show in shows:
-                occ = show["occupancy"]
+            for d in data.get("details", []):
+                summary.cities[(movie, d["state"], d["city"])] = cls._block(d, city=d["city"], state=d["state"])
 
-                # overall
-                movie_stats[movie]["shows"] += 1
-                movie_stats[movie]["gross"] += show["gross"]
-                movie_stats[movie]["sold"] += show["sold"]
-                movie_stats[movie]["totalSeats"] += show["total"]
+            for d in data.get("Chain_details", []):
+                summary.chains[(movie, d["chain"])] = cls._block(d, chain=d["chain"])
+        return summary
 
-                if occ >= 98:
-                    movie_stats[movie]["housefull"] += 1
-                elif occ >= 50:
-                    movie_stats[movie]["fastfilling"] += 1
 
-                # city-level
-                city_obj["shows"] += 1
-                city_obj["gross"] += show["gross"]
-                city_obj["sold"] += show["sold"]
-                city_obj["totalSeats"] += show["total"]
+def merge_summaries(parts):
+    return reduce(MovieSummary.merge, parts, MovieSummary())
 
-                if occ >= 98:
-                    city_obj["housefull"] += 1
-                elif occ >= 50:
-                    city_obj["fastfilling"] += 1
 
-    return movie_stats
+# ---------------- SHOW STORE ----------------
+SHOWS_COMPRESSION = "snappy"  # --compress: Parquet codec for show parts (snappy, zstd, gzip, none)
+SHOWS_DIR = "shows"  # Parquet parts, partitioned as <state root>/shows/date_code=<date_code>/
+SHOW_KEY = ("date_code", "venue_code", "session_id")  # one show, in parts and in ShowDB
+SHOWS_COMPACT_PARTS = 32  # parts in a date's partition before a flush folds them into one
 
 
-# ---------------- PROGRESS ----------------
-def dump_progress(all_data, fetched_venues):
-    # Load existing summary if present
-    if os.path.exists("movie_summary.json"):
-        with open("movie_summary.json", "r", encoding="utf-8") as f:
-            try:
-                movie_summary = json.load(f)
-            except:
-                movie_summary = {}
-    else:
-        movie_summary = {}
+class ShowTable:
+    """Columnar, dictionary-encoded buffer of show rows.
 
-    # Load venues info for city/state mapping
-    if os.path.exists("venues.json"):
-        with open("venues.json", "r", encoding="utf-8") as f:
-            venues_info = json.load(f)
-    else:
-        venues_info = {}
+    String columns hold int32 codes into a per-column dictionary, so venue,
+    chain and movie strings are stored once instead of once per show. Rows are
+    drained into a Parquet part on every checkpoint flush.
+    """
 
-    # Load already processed venues
-    if os.path.exists("processed_venues.json"):
-        with open("processed_venues.json", "r", encoding="utf-8") as f:
-            try:
-                processed_venues = set(json.load(f))
-            except:
-                processed_venues = set()
-    else:
-        processed_venues = set()
-
-    # --- Process only NEW venues ---
-    new_venues = set(fetched_venues) - processed_venues
-
-    for vcode in new_venues:
-        venue_meta = venues_info.get(vcode, {})
-        city = venue_meta.get("City", "Unknown")
-        state = venue_meta.get("State", "Unknown")
-
-        for movie, shows in all_data.get(vcode, {}).items():
-            if movie not in movie_summary:
-                movie_summary[movie] = {
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "venues": 0,
-                    "cities": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "occupancy": 0.0,
-                    "details": [],
-                    "Chain_details": [],  # <-- add this
-                }
+    STR_COLUMNS = (
+        "venue_code",
+        "venue",
+        "address",
+        "chain",
+        "movie",
+        "title",
+        "parent_event_code",
+        "child_event_code",
+        "dimension",
+        "language",
+        "time",
+        "session_id",
+        "audi",
+    )
+    INT_COLUMNS = ("total", "sold", "available")
+    FLOAT_COLUMNS = ("occupancy", "gross", "fetched_at")
+
+    NAMES = STR_COLUMNS + INT_COLUMNS + FLOAT_COLUMNS
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dictionaries = {col: {} for col in self.STR_COLUMNS}
+        self._reset()
+
+    def _reset(self):
+        self.columns = {col: array("i") for col in self.STR_COLUMNS + self.INT_COLUMNS}
+        self.columns.update({col: array("d") for col in self.FLOAT_COLUMNS})
+
+    def __len__(self):
+        return len(self.columns["total"])
+
+    def append_venue(self, movies, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self.lock:
+            columns = self.columns
+            for shows in movies.values():
+                for show in shows:
+                    for col in self.STR_COLUMNS:
+                        value = getattr(show, col)
+                        value = "" if value is None else str(value)
+                        codes = self.dictionaries[col]
+                        code = codes.get(value)
+                        if code is None:
+                            code = codes[value] = len(codes)
+                        columns[col].append(code)
+                    for col in self.INT_COLUMNS:
+                        columns[col].append(getattr(show, col))
+                    columns["occupancy"].append(show.occupancy)
+                    columns["gross"].append(show.gross)
+                    columns["fetched_at"].append(fetched_at)
+
+    def _categories(self, col):
+        # dict insertion order == code order
+        return list(self.dictionaries[col])
+
+    def to_frame(self):
+        import numpy as np
+        import pandas as pd
+
+        with self.lock:
+            data = {}
+            for col in self.STR_COLUMNS:
+                data[col] = pd.Categorical.from_codes(
+                    np.frombuffer(self.columns[col], dtype=np.int32),
+                    self._categories(col),
+                )
+            for col in self.INT_COLUMNS:
+                data[col] = np.frombuffer(self.columns[col], dtype=np.int32).copy()
+            for col in self.FLOAT_COLUMNS:
+                data[col] = np.frombuffer(self.columns[col], dtype=np.float64).copy()
+        return pd.DataFrame(data)
+
+    def drain(self):
+        # hands the buffered rows to the caller and starts a fresh buffer
+        with self.lock:
+            if not len(self):
+                return None
+            columns = self.columns
+            categories = {col: self._categories(col) for col in self.STR_COLUMNS}
+            self._reset()
+        return columns, categories
+
+    @classmethod
+    def rows(cls, drained):
+        # drained columns back as (name, ...) tuples in NAMES order
+        columns, categories = drained
+        decoded = []
+        for col in cls.NAMES:
+            if col in categories:
+                values = categories[col]
+                decoded.append([values[code] for code in columns[col]])
+            else:
+                decoded.append(columns[col])
+        return zip(*decoded)
+
+    @staticmethod
+    def arrow_table(drained):
+        import numpy as np
+
+        pa, _ = arrow()
+        columns, categories = drained
+        arrays = {}
+        for col in ShowTable.STR_COLUMNS:
+            indices = pa.array(np.frombuffer(columns[col], dtype=np.int32))
+            arrays[col] = pa.DictionaryArray.from_arrays(
+                indices, pa.array(categories[col], type=pa.string())
+            )
+        for col in ShowTable.INT_COLUMNS:
+            arrays[col] = pa.array(np.frombuffer(columns[col], dtype=np.int32))
+        for col in ShowTable.FLOAT_COLUMNS:
+            arrays[col] = pa.array(np.frombuffer(columns[col], dtype=np.float64))
+        return pa.table(arrays)
+
+    def write_part(self, date_code, drained=None, base_dir=os.path.join(STATE_DIR, SHOWS_DIR)):
+        if not ARROW:
+            return None
+        drained = self.drain() if drained is None else drained
+        if drained is None:
+            return None
+        table = self.arrow_table(drained)
+
+        part_dir = os.path.join(base_dir, f"date_code={date_code}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f"part-{time.time_ns()}.parquet")
+        arrow()[1].write_table(table, f"{path}.tmp", compression=SHOWS_COMPRESSION)
+        os.replace(f"{path}.tmp", path)
+        return path
+
+
+def load_shows(date_code, show_table=None, base_dir=os.path.join(STATE_DIR, SHOWS_DIR), venue_codes=None):
+    # show rows of one date from its Parquet parts (plus any not yet
+    # drained from show_table), limited to venue_codes when given
+    import numpy as np
+    import pandas as pd
+
+    frames = []
+    part_dir = os.path.join(base_dir, f"date_code={date_code}")
+    if ARROW and os.path.isdir(part_dir):
+        parts = sorted(p for p in os.listdir(part_dir) if p.endswith(".parquet"))
+        frames += [pd.read_parquet(os.path.join(part_dir, p)) for p in parts]
+    if show_table is not None and len(show_table):
+        frames.append(show_table.to_frame())
+    if not frames:
+        shows = ShowTable().to_frame()
+        shows.insert(0, "date_code", pd.Series(dtype=np.int32))
+        return shows
+
+    shows = pd.concat(frames, ignore_index=True)
+    if venue_codes is not None:
+        shows = shows[shows["venue_code"].isin(venue_codes)]
+    for col in ShowTable.STR_COLUMNS:
+        shows[col] = shows[col].astype("category")
+    # the partition directory is the date; rows carry it like ShowDB's do
+    shows.insert(0, "date_code", np.int32(date_code))
+
+    # a venue's latest fetch lists all of its sessions: earlier fetches (an
+    # earlier --poll cycle, or a crash between a part write and the
+    # checkpoint swap) only hold sessions it has since updated or dropped.
+    # Part file names do not order fetches, fetched_at does.
+    venue = ["date_code", "venue_code"]
+    latest = shows.groupby(venue, observed=True)["fetched_at"].transform("max")
+    shows = shows[shows["fetched_at"] == latest]
+    shows = shows.sort_values("fetched_at", kind="stable")
+    return shows.drop_duplicates(list(SHOW_KEY), keep="last").reset_index(drop=True)
+
+
+def compact_parts(date_code, base_dir=os.path.join(STATE_DIR, SHOWS_DIR), min_parts=2):
+    # folds a date's parts into one holding only what load_shows() returns
+    # from them, each venue's latest rows, so --poll does not grow the
+    # partition by a copy of every venue per cycle. The new part goes in
+    # before the old ones go: a crash in between only leaves rows that
+    # load_shows() drops again.
+    part_dir = os.path.join(base_dir, f"date_code={date_code}")
+    if not ARROW or not os.path.isdir(part_dir):
+        return None
+    parts = [p for p in os.listdir(part_dir) if p.endswith(".parquet")]
+    if len(parts) < min_parts:
+        return None
+    pa, pq = arrow()
+    shows = load_shows(date_code, base_dir=base_dir).drop(columns="date_code")
+    path = os.path.join(part_dir, f"part-{time.time_ns()}.parquet")
+    table = pa.Table.from_pandas(shows, preserve_index=False)
+    pq.write_table(table, f"{path}.tmp", compression=SHOWS_COMPRESSION)
+    os.replace(f"{path}.tmp", path)
+    for part in parts:
+        os.remove(os.path.join(part_dir, part))
+    return path
+
+
+# ---------------- SHOW DATABASE ----------------
+SHOW_DB = "shows.db"  # --db: SQLite file under the state root
+
+SHOW_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shows (
+    date_code INTEGER NOT NULL,
+    venue_code TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    venue TEXT, address TEXT, chain TEXT, city TEXT, state TEXT,
+    movie TEXT, title TEXT, parent_event_code TEXT, child_event_code TEXT,
+    dimension TEXT, language TEXT, time TEXT, audi TEXT,
+    total INTEGER, sold INTEGER, available INTEGER,
+    occupancy REAL, gross REAL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (date_code, venue_code, session_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS shows_movie ON shows (date_code, movie);
+CREATE INDEX IF NOT EXISTS shows_city ON shows (date_code, state, city);
+CREATE INDEX IF NOT EXISTS shows_chain ON shows (date_code, chain);
+
+-- one row per show whenever its seat counts change
+CREATE TABLE IF NOT EXISTS show_history (
+    date_code INTEGER NOT NULL,
+    venue_code TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    sold INTEGER, available INTEGER, gross REAL,
+    PRIMARY KEY (date_code, venue_code, session_id, fetched_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS fetches (
+    date_code INTEGER NOT NULL,
+    venue_code TEXT NOT NULL,
+    PRIMARY KEY (date_code, venue_code)
+) WITHOUT ROWID;
+"""
+
+# the same buckets and counters MovieSummary keeps, as GROUP BYs
+SHOW_DB_ROLLUPS = {
+    "movies": ("movie",),
+    "cities": ("movie", "state", "city"),
+    "chains": ("movie", "chain"),
+}
+SHOW_OCC = "(CASE WHEN total > 0 THEN sold * 1.0 / total * 100 ELSE 0 END)"
+
+
+class ShowDB:
+    """SQLite store of the latest row per (date_code, venue_code, session_id),
+    its seat-count history, and which venues each date has fetched.
+
+    Every checkpoint flush is one transaction, so after a crash the database
+    holds either all of a batch or none of it, and movie_summary.json/.csv
+    are rebuilt from it with summary().
+    """
+
+    COLUMNS = ("date_code", "city", "state") + ShowTable.NAMES
+    KEY = SHOW_KEY
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SHOW_DB_SCHEMA)
+
+        columns = ", ".join(self.COLUMNS)
+        updates = ", ".join(f"{col} = excluded.{col}" for col in self.COLUMNS if col not in self.KEY)
+        self.upsert_sql = (
+            f"INSERT INTO shows ({columns}) VALUES ({', '.join('?' * len(self.COLUMNS))}) "
+            f"ON CONFLICT ({', '.join(self.KEY)}) DO UPDATE SET {updates}"
+        )
+        # run before the upsert, so `shows` still holds the previous counts
+        self.history_sql = (
+            "INSERT OR IGNORE INTO show_history "
+            "SELECT :date_code, :venue_code, :session_id, :fetched_at, :sold, :available, :gross "
+            "WHERE NOT EXISTS (SELECT 1 FROM shows WHERE date_code = :date_code "
+            "AND venue_code = :venue_code AND session_id = :session_id "
+            "AND sold = :sold AND available = :available)"
+        )
 
-            # --- Update top-level movie stats ---
-            movie_summary[movie]["venues"] += 1
-            for show in shows:
-                sold = show["sold"]
-                total = show["total"]
-                occ = (sold / total * 100) if total > 0 else 0
-
-                movie_summary[movie]["shows"] += 1
-                movie_summary[movie]["gross"] += show["gross"]
-                movie_summary[movie]["sold"] += sold
-                movie_summary[movie]["totalSeats"] += total
-
-                if 50 <= occ < 98:
-                    movie_summary[movie]["fastfilling"] += 1
-                elif occ >= 98:
-                    movie_summary[movie]["housefull"] += 1
-
-            # --- Update city/state level ---
-            city_block = None
-            for d in movie_summary[movie]["details"]:
-                if d["city"] == city and d["state"] == state:
-                    city_block = d
-                    break
+    def write(self, date_code, drained, fetched, polled, registry):
+        # polled: venue_code -> fetched_at of its latest poll; sessions such a
+        # venue no longer lists are dropped from `shows`
+        rows = []
+        if drained is not None:
+            for row in ShowTable.rows(drained):
+                city, state = registry.location(row[0])
+                rows.append((date_code, city, state) + row)
+        history = [dict(zip(self.COLUMNS, row)) for row in rows]
+
+        with self.lock, self.conn:
+            self.conn.executemany(self.history_sql, history)
+            self.conn.executemany(self.upsert_sql, rows)
+            self.conn.executemany(
+                "DELETE FROM shows WHERE date_code = ? AND venue_code = ? AND fetched_at < ?",
+                [(date_code, venue_code, fetched_at) for venue_code, fetched_at in polled.items()],
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO fetches VALUES (?, ?)",
+                [(date_code, venue_code) for venue_code in fetched],
+            )
 
-            if city_block is None:
-                city_block = {
-                    "city": city,
-                    "state": state,
-                    "venues": 0,
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "occupancy": 0.0,
+    def fetched(self, date_code):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT venue_code FROM fetches WHERE date_code = ?", (date_code,)
+            )
+            return {venue_code for venue_code, in rows}
+
+    def summary(self, date_code):
+        summary = MovieSummary()
+        with self.lock:
+            for name, keys in SHOW_DB_ROLLUPS.items():
+                group = ", ".join(keys)
+                rows = self.conn.execute(
+                    f"SELECT {group}, COUNT(DISTINCT venue_code), COUNT(*), CAST(ROUND(SUM(gross) * 100) AS INTEGER), "
+                    f"SUM(sold), SUM(total), SUM({SHOW_OCC} >= 50 AND {SHOW_OCC} < 98), "
+                    f"SUM({SHOW_OCC} >= 98) FROM shows WHERE date_code = ? GROUP BY {group}",
+                    (date_code,),
+                )
+                index = getattr(summary, name)
+                for row in rows:
+                    block = new_block(**dict(zip(keys[1:], row[1 : len(keys)])))
+                    block.update(zip(COUNTERS, row[len(keys) :]))
+                    index[row[0] if len(keys) == 1 else row[: len(keys)]] = block
+
+            rows = self.conn.execute(
+                "SELECT movie, MIN(title), MIN(dimension), MIN(language) "
+                "FROM shows WHERE date_code = ? GROUP BY movie",
+                (date_code,),
+            )
+            for movie, title, dimension, language in rows:
+                summary.meta[movie] = {"title": title, "dimension": dimension, "language": language}
+        return summary
+
+    def history(self, date_code, venue_code, session_id):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT fetched_at, sold, available, gross FROM show_history "
+                "WHERE date_code = ? AND venue_code = ? AND session_id = ? ORDER BY fetched_at",
+                (date_code, venue_code, session_id),
+            ).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# ---------------- SALES VELOCITY ----------------
+SALES_SERIES = "sales.idx"  # per-date snapshot store, next to the checkpoint files
+VELOCITY_REPORT = "velocity.json"
+VELOCITY_WEIGHT = 0.5  # weight of the newest poll in a session's tickets/hour
+
+
+class SalesSeries:
+    """Sold/gross snapshots of every session of one date, array-backed.
+
+    Sessions are numbered on first sight. Their movie, city and chain codes,
+    capacity, start time, latest sold/gross and a tickets/hour rate smoothed
+    over polls sit in one array per field, updated in place on every poll;
+    the velocity engine only reads those, so trends cost one vectorized pass
+    over sessions however long the history. The history itself is four
+    columns (session, time, sold, gross), appended only when sales move.
+    """
+
+    SESSION_COLUMNS = {
+        "movie": "i",
+        "place": "i",
+        "chain": "i",
+        "total": "i",
+        "start": "d",
+        "first_t": "d",
+        "first_sold": "i",
+        "last_t": "d",
+        "sold": "i",
+        "paise": "q",
+        "rate": "d",
+    }
+    SNAPSHOT_COLUMNS = {"sid": "i", "t": "I", "sold": "i", "paise": "q"}
+    VERSION = 2  # saved files of another version start over
+    GROUPS = {"movie": ("movie",), "place": ("city", "state"), "chain": ("chain",)}
+
+    def __init__(self, date_code=DATE_CODE):
+        self.date_code = date_code
+        self.lock = threading.Lock()
+        self.ids = {}  # "venue_code\0session_id" -> session number
+        self.names = {group: {} for group in self.GROUPS}  # value -> code
+        self.sessions = {col: array(code) for col, code in self.SESSION_COLUMNS.items()}
+        self.snapshots = {col: array(code) for col, code in self.SNAPSHOT_COLUMNS.items()}
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _code(self, group, value):
+        codes = self.names[group]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    def _new_session(self, key, show, city, state, fetched_at):
+        sid = self.ids[key] = len(self.ids)
+        start = show_start(self.date_code, show.time)
+        values = {
+            "movie": self._code("movie", show.movie),
+            "place": self._code("place", (city, state)),
+            "chain": self._code("chain", show.chain or "Unknown"),
+            "total": show.total,
+            "start": start.timestamp() if start is not None else float("nan"),
+            "first_t": fetched_at,
+            "first_sold": show.sold,
+            "last_t": fetched_at,
+            "sold": show.sold,
+            "paise": show.paise,
+            "rate": float("nan"),  # needs a second poll
+        }
+        for col, column in self.sessions.items():
+            column.append(values[col])
+        return sid
+
+    def _snapshot(self, sid, fetched_at, sold, paise):
+        self.snapshots["sid"].append(sid)
+        self.snapshots["t"].append(int(fetched_at))
+        self.snapshots["sold"].append(sold)
+        self.snapshots["paise"].append(paise)
+
+    def observe(self, venue_code, city, state, movies, fetched_at):
+        sessions = self.sessions
+        with self.lock:
+            self.dirty = True
+            for shows in movies.values():
+                for show in shows:
+                    key = f"{venue_code}\0{show.session_id}"
+                    sold, paise = show.sold, show.paise
+                    sid = self.ids.get(key)
+                    if sid is None:
+                        sid = self._new_session(key, show, city, state, fetched_at)
+                        self._snapshot(sid, fetched_at, sold, paise)
+                        continue
+
+                    hours = (fetched_at - sessions["last_t"][sid]) / 3600
+                    if hours <= 0:
+                        continue
+                    per_hour = max(0, sold - sessions["sold"][sid]) / hours
+                    rate = sessions["rate"][sid]
+                    sessions["rate"][sid] = per_hour if rate != rate else rate + VELOCITY_WEIGHT * (per_hour - rate)
+                    sessions["last_t"][sid] = fetched_at
+                    sessions["total"][sid] = show.total
+                    if sold != sessions["sold"][sid] or paise != sessions["paise"][sid]:
+                        sessions["sold"][sid] = sold
+                        sessions["paise"][sid] = paise
+                        self._snapshot(sid, fetched_at, sold, paise)
+
+    def _arrays(self, columns):
+        import numpy as np
+
+        with self.lock:
+            return {
+                col: np.frombuffer(column, dtype=column.typecode).copy()
+                for col, column in columns.items()
+            }
+
+    def history(self, venue_code, session_id):
+        # [(fetched_at, sold, gross)] of one session, oldest first
+        sid = self.ids.get(f"{venue_code}\0{session_id}")
+        if sid is None:
+            return []
+        snaps = self._arrays(self.snapshots)
+        mask = snaps["sid"] == sid
+        return list(zip(snaps["t"][mask].tolist(), snaps["sold"][mask].tolist(), (snaps["paise"][mask] / 100).tolist()))
+
+    def velocity(self, group="movie", now_ts=None):
+        # per movie, place (city, state) or chain: tickets/hour over the
+        # sessions still to start, and occupancy and gross projected to
+        # showtime at that rate
+        import numpy as np
+
+        now_ts = time.time() if now_ts is None else now_ts
+        cols = self._arrays(self.sessions)
+        with self.lock:
+            names = list(self.names[group])
+        if not names:
+            return []
+
+        rate = np.nan_to_num(cols["rate"])
+        hours_left = np.nan_to_num(np.clip((cols["start"] - now_ts) / 3600, 0, None))
+        sold, gross, total = cols["sold"], cols["paise"] / 100, cols["total"]
+        projected = np.minimum(np.maximum(total, sold), sold + rate * hours_left)
+        # unsold seats go at the session's own ATP, or the date's for sessions
+        # that have not sold yet
+        sold_any = sold > 0
+        overall = gross.sum() / sold.sum() if sold.sum() else 0.0
+        atp = np.divide(gross, sold, out=np.full(len(sold), overall), where=sold_any)
+        projected_gross = gross + (projected - sold) * atp
+
+        codes = cols[group]
+        size = len(names)
+
+        def total_of(weights=None):
+            return np.bincount(codes, weights=weights, minlength=size)
+
+        seats = total_of(total)
+        rows = []
+        for code, sessions, per_hour, sold_now, seats_total, proj, gross_now, proj_gross in zip(
+            range(size),
+            total_of(),
+            total_of(rate * (hours_left > 0)),
+            total_of(sold),
+            seats,
+            total_of(projected),
+            total_of(gross),
+            total_of(projected_gross),
+        ):
+            rows.append(
+                {
+                    **dict(zip(self.GROUPS[group], names[code] if group == "place" else (names[code],))),
+                    "sessions": int(sessions),
+                    "tickets_per_hour": round(float(per_hour), 2),
+                    "sold": int(sold_now),
+                    "occupancy": round(float(sold_now / seats_total * 100), 2) if seats_total else 0,
+                    "projected_occupancy": round(float(proj / seats_total * 100), 2) if seats_total else 0,
+                    "gross": round(float(gross_now), 2),
+                    "projected_gross": round(float(proj_gross), 2),
                 }
-                movie_summary[movie]["details"].append(city_block)
-                movie_summary[movie]["cities"] += 1  # new city found
-
-            city_block["venues"] += 1  # add this venue under that city
-
-            for show in shows:
-                sold = show["sold"]
-                total = show["total"]
-                occ = (sold / total * 100) if total > 0 else 0
-
-                city_block["shows"] += 1
-                city_block["gross"] += show["gross"]
-                city_block["sold"] += sold
-                city_block["totalSeats"] += total
-
-                if 50 <= occ < 98:
-                    city_block["fastfilling"] += 1
-                elif occ >= 98:
-                    city_block["housefull"] += 1
-
-            # --- Update city occupancy ---
-            if city_block["totalSeats"] > 0:
-                city_block["occupancy"] = round(
-                    city_block["sold"] / city_block["totalSeats"] * 100, 2
+            )
+        return sorted(rows, key=lambda r: -r["projected_gross"])
+
+    def report(self, now_ts=None):
+        return {
+            "generated_at": datetime.now(IST).isoformat(timespec="seconds"),
+            "sessions": len(self),
+            "snapshots": len(self.snapshots["sid"]),
+            **{group: self.velocity(group, now_ts) for group in self.GROUPS},
+        }
+
+    def save(self, path):
+        with self.lock:
+            snap = {
+                "version": self.VERSION,
+                "date_code": self.date_code,
+                "ids": "\n".join(self.ids),
+                "names": {group: list(codes) for group, codes in self.names.items()},
+                "sessions": {col: column.tobytes() for col, column in self.sessions.items()},
+                "snapshots": {col: column.tobytes() for col, column in self.snapshots.items()},
+            }
+            self.dirty = False
+        with open(f"{path}.tmp", "wb") as f:
+            marshal.dump(snap, f)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path, date_code=DATE_CODE):
+        series = cls(date_code)
+        if not os.path.exists(path):
+            return series
+        try:
+            with open(path, "rb") as f:
+                snap = marshal.load(f)
+        except (EOFError, ValueError, TypeError):
+            return series
+        if snap.get("version") != cls.VERSION:
+            return series
+        keys = snap["ids"].split("\n") if snap["ids"] else []
+        series.ids = {key: sid for sid, key in enumerate(keys)}
+        for group, values in snap["names"].items():
+            series.names[group] = {
+                tuple(value) if isinstance(value, list) else value: code
+                for code, value in enumerate(values)
+            }
+        for table, columns in (("sessions", series.sessions), ("snapshots", series.snapshots)):
+            for col, data in snap[table].items():
+                columns[col].frombytes(data)
+        return series
+
+
+# ---------------- PROGRESS ----------------
+CHECKPOINT_EVERY = 25  # flush after this many newly fetched venues
+CHECKPOINT_INTERVAL = 30  # ... or after this many seconds, whichever comes first
+
+
+def dumps(obj, pretty=False):
+    # UTF-8 bytes; checkpoints are compact, pretty is for files people read
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "rb") as f:
+        try:
+            return loads(f.read())
+        except ValueError:
+            return default
+
+
+def tmp_path(path):
+    # per process and thread, so writers sharing a file (shards on one host,
+    # the checkpoint thread and a final flush) never truncate each other's
+    return f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+@contextmanager
+def locked(path):
+    # exclusive across processes for read-modify-write of files under the
+    # --state-dir root that every shard updates
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_json_tmp(path, data):
+    tmp = tmp_path(path)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp
+
+
+CHECKPOINT_FILE = "checkpoint.json"  # summary, venue sets and dead letters, swapped in as one
+RESUME_INDEX = "resume.idx"  # fetched/processed bitsets over registry rows
+RESUME_LOG = "resume.log"  # rows completed since the bitsets were written
+RESUME_COMPACT_EVERY = 4096  # log entries before the bitsets are rewritten
+
+
+def load_checkpoint(directory):
+    # {"summary", "fetched", "processed", "dead_letter"} as of the last flush;
+    # a state dir written before CHECKPOINT_FILE existed reads its exports
+    checkpoint = load_json(os.path.join(directory, CHECKPOINT_FILE), None)
+    if checkpoint is not None:
+        return checkpoint
+    return {
+        "summary": load_json(os.path.join(directory, "movie_summary.json"), {}),
+        "fetched": load_json(os.path.join(directory, "fetchedvenues.json"), []),
+        "processed": load_json(os.path.join(directory, "processed_venues.json"), []),
+        "dead_letter": load_json(os.path.join(directory, "dead_letter.json"), {}),
+    }
+
+
+def checkpoint_text(summary_text, fetched_text, processed_text, dead_letter_text):
+    # the already serialized parts, spliced rather than dumped a second time
+    return b"".join((
+        b'{"summary":', summary_text,
+        b',"fetched":', fetched_text,
+        b',"processed":', processed_text,
+        b',"dead_letter":', dead_letter_text,
+        b"}",
+    ))
+
+
+class ResumeIndex:
+    """Which venues of a date are done, for a fast restart: a fetched and a
+    processed bitset over the registry's row numbers, plus an append-only
+    log of uint32 entries (row * 2, +1 when processed too) for what has
+    been completed since. Each checkpoint appends a few bytes; the bitsets
+    are only rewritten every RESUME_COMPACT_EVERY entries.
+    """
+
+    def __init__(self, directory, registry):
+        self.idx_path = os.path.join(directory, RESUME_INDEX)
+        self.log_path = os.path.join(directory, RESUME_LOG)
+        self.registry = registry
+        self.log_entries = 0
+
+    def load(self, newer_than=()):
+        # (fetched, processed) code sets, or None when there is no index, it
+        # was written against a different venues.json, or one of the
+        # newer_than files (the JSON it mirrors) was written after it
+        try:
+            written = max(os.path.getmtime(p) for p in (self.idx_path, self.log_path) if os.path.exists(p))
+            if any(os.path.exists(p) and os.path.getmtime(p) > written for p in newer_than):
+                return None
+            with open(self.idx_path, "rb") as f:
+                snap = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not isinstance(snap, dict) or snap.get("digest") != self.registry.digest():
+            return None
+
+        fetched, processed = bytearray(snap["fetched"]), bytearray(snap["processed"])
+        log = array("I")
+        try:
+            with open(self.log_path, "rb") as f:
+                data = f.read()
+            log.frombytes(data[: len(data) // log.itemsize * log.itemsize])  # drop a torn tail
+        except OSError:
+            pass
+        for entry in log:
+            row = entry >> 1
+            fetched[row >> 3] |= 1 << (row & 7)
+            if entry & 1:
+                processed[row >> 3] |= 1 << (row & 7)
+        self.log_entries = len(log)
+        return self._codes(fetched), self._codes(processed)
+
+    def _codes(self, bits):
+        codes = self.registry.codes
+        return {
+            codes[(i << 3) + j]
+            for i, byte in enumerate(bits)
+            if byte
+            for j in range(8)
+            if byte >> j & 1
+        }
+
+    def entry(self, venue_code, processed):
+        row = self.registry.rows.get(venue_code)
+        return None if row is None else row * 2 + processed
+
+    def append(self, entries):
+        # called after every JSON swap, even with nothing new: load() only
+        # trusts the index while the log is at least as recent as the JSON
+        with open(self.log_path, "ab") as f:
+            if entries:
+                f.write(entries.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        os.utime(self.log_path)
+        self.log_entries += len(entries)
+
+    def write(self, fetched, processed):
+        size = (len(self.registry) + 7) // 8
+        bitsets = []
+        for codes in (fetched, processed):
+            bits = bytearray(size)
+            for code in codes:
+                row = self.registry.rows.get(code)
+                if row is not None:
+                    bits[row >> 3] |= 1 << (row & 7)
+            bitsets.append(bytes(bits))
+        snap = {"digest": self.registry.digest(), "fetched": bitsets[0], "processed": bitsets[1]}
+        with open(f"{self.idx_path}.tmp", "wb") as f:
+            marshal.dump(snap, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{self.idx_path}.tmp", self.idx_path)
+        # the log only repeats what the bitsets now hold
+        with open(self.log_path, "wb"):
+            pass
+        self.log_entries = 0
+
+
+class _Partial:
+    __slots__ = ("lock", "summary")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.summary = MovieSummary()
+
+
+class CheckpointWriter:
+    """Keeps one date's movie aggregates in memory and flushes them to
+    state/<date_code>/ in batches.
+
+    Workers call add_venue() after every fetch and aggregate into a
+    MovieSummary partial of their own, so the show loop never waits on
+    another thread; the partials are merged into the date's summary when it
+    is read or flushed. The files are only rewritten every CHECKPOINT_EVERY
+    venues or CHECKPOINT_INTERVAL seconds by a background thread, and on
+    flush()/close().
+    """
+
+    def __init__(
+        self,
+        registry,
+        date_code=DATE_CODE,
+        state_dir=STATE_DIR,
+        every=CHECKPOINT_EVERY,
+        interval=CHECKPOINT_INTERVAL,
+        db=None,
+    ):
+        self.registry = registry
+        self.db = db
+        self.date_code = date_code
+        self.dir = os.path.join(state_dir, str(date_code))
+        os.makedirs(self.dir, exist_ok=True)
+        self.shows_dir = os.path.join(state_dir, SHOWS_DIR)
+        # rows are only buffered while something drains them: Parquet parts
+        # (which the reports read back) or ShowDB
+        self.show_table = ShowTable() if ARROW or db is not None else None
+        self.every = every
+        self.interval = interval
+
+        self.index = ResumeIndex(self.dir, registry)
+        self.unlogged = array("I")  # resume log entries since the last flush
+        self.index_stale = False  # rewrite the bitsets at the next flush
+        self._loaded = threading.Event()
+        if db is not None:
+            # the database commits before the JSON files are swapped in, so it
+            # is the more recent of the two after a crash
+            self.summary = db.summary(date_code)
+            self.fetched_venues = db.fetched(date_code)
+            self.processed_venues = set(self.fetched_venues)
+            self._loaded.set()
+        else:
+            resumed = self.index.load(newer_than=(self.path(CHECKPOINT_FILE),))
+            if resumed is None:  # first run with an index, or venues.json changed
+                checkpoint = load_checkpoint(self.dir)
+                resumed = set(checkpoint["fetched"]), set(checkpoint["processed"])
+                self.index_stale = True
+            self.fetched_venues, self.processed_venues = resumed
+            # workers only add to their partials, so the saved summary can
+            # be read while the first requests are already out; _collected()
+            # waits for it
+            self.summary = MovieSummary()
+            threading.Thread(target=self._load_summary, daemon=True).start()
+        self.dead_letter = {}
+        self.snapshots = {}  # venue_code -> movies last applied (--poll)
+        self.series = SalesSeries.load(self.path(SALES_SERIES), date_code)  # fed by --poll
+        self.polled = {}  # venue_code -> fetched_at, replaced since the last flush
+
+        self.lock = threading.Lock()  # guards the venue sets and counters
+        self.partials_lock = threading.Lock()  # guards the partials list
+        self.partials = []  # one _Partial per worker thread
+        self._local = threading.local()
+        self.flush_lock = threading.Lock()  # serializes file writes
+        self.pending = 0
+        self.new_since_flush = 0
+        self.version = 0  # bumped on every change to the aggregates
+        self.flushed_version = 0
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def path(self, name):
+        return os.path.join(self.dir, name)
+
+    def _load_summary(self):
+        try:
+            self.summary = MovieSummary.from_json(load_checkpoint(self.dir)["summary"])
+        finally:
+            self._loaded.set()
+
+    # --- worker side ---
+    def is_fetched(self, venue_code):
+        with self.lock:
+            return venue_code in self.fetched_venues
+
+    def _partial(self):
+        partial = getattr(self._local, "partial", None)
+        if partial is None:
+            partial = self._local.partial = _Partial()
+            with self.partials_lock:
+                self.partials.append(partial)
+        return partial
+
+    def _log(self, venue_code, processed):
+        # caller holds self.lock
+        entry = self.index.entry(venue_code, processed)
+        if entry is not None:
+            self.unlogged.append(entry)
+
+    def _mark(self, venue_code):
+        # caller holds self.lock
+        self.fetched_venues.add(venue_code)
+        self.processed_venues.add(venue_code)
+        self._log(venue_code, True)
+        self.new_since_flush += 1
+
+    def _bump(self):
+        # caller holds self.lock
+        self.version += 1
+        self.pending += 1
+        if self.pending >= self.every:
+            self._wake.set()
+
+    def add_venue(self, venue_code, movies, venue_summary=None):
+        # venue_summary: the venue's rollups when already aggregated elsewhere
+        partial = self._partial()
+        with partial.lock:
+            with self.lock:
+                fresh = venue_code not in self.processed_venues
+                if fresh:
+                    self._mark(venue_code)
+                else:
+                    self.fetched_venues.add(venue_code)
+                    self._log(venue_code, False)
+                self._bump()
+            if fresh:
+                with metrics.timer("bms_aggregate_seconds"):
+                    if venue_summary is not None:
+                        partial.summary.merge(venue_summary)
+                    else:
+                        city, state = self.registry.location(venue_code)
+                        partial.summary.add_venue(city, state, movies or {})
+
+    def replace_venue(self, venue_code, movies, fetched_at=None):
+        # swap the venue's previous snapshot for a fresh one; returns the old
+        # snapshot (None on the first poll)
+        partial = self._partial()
+        with partial.lock:
+            with self.lock:
+                old = self.snapshots.get(venue_code)
+                self.snapshots[venue_code] = movies
+                if fetched_at is not None:
+                    self.polled[venue_code] = fetched_at
+                self._mark(venue_code)
+                self._bump()
+            city, state = self.registry.location(venue_code)
+            with metrics.timer("bms_aggregate_seconds"):
+                if old:
+                    partial.summary.add_venue(city, state, old, sign=-1)
+                partial.summary.add_venue(city, state, movies)
+        return old
+
+    def reset(self):
+        # aggregates loaded from disk cannot be diffed against, so polling
+        # starts from an empty summary and rebuilds it on its first pass
+        with self._collected():
+            self.summary = MovieSummary()
+            self.version += 1
+            self.fetched_venues.clear()
+            self.processed_venues.clear()
+            self.unlogged = array("I")
+            self.index_stale = True
+            self.snapshots.clear()
+            self.polled.clear()
+
+    def add_dead_letter(self, venue_code, attempts):
+        metrics.inc("bms_dead_letters_total")
+        with self.lock:
+            self.dead_letter[venue_code] = {
+                "attempts": attempts,
+                "failed_at": datetime.now(IST).isoformat(timespec="seconds"),
+            }
+        print(f"☠️ Giving up on {venue_code} ({self.date_code}) after {attempts} attempts")
+
+    @contextmanager
+    def _collected(self):
+        # holds every partial and the venue sets at one consistent point, with
+        # the partials folded into self.summary. Lock order is partials_lock,
+        # then partial locks, then self.lock; workers only ever hold their own
+        # partial's lock before self.lock.
+        self._loaded.wait()
+        with self.partials_lock, ExitStack() as held:
+            for partial in self.partials:
+                held.enter_context(partial.lock)
+            with self.lock:
+                for partial in self.partials:
+                    self.summary.merge(partial.summary)
+                    partial.summary = MovieSummary()
+                self.summary.prune()
+                yield
+
+    def snapshot(self):
+        # (version, a copy of the summary) for readers that should not hold
+        # the workers up while they work on it
+        if self.db is not None:
+            return self.flushed_version, self.db.summary(self.date_code)
+        with self._collected():
+            return self.version, MovieSummary().merge(self.summary)
+
+    @property
+    def movie_summary(self):
+        if self.db is not None:
+            # as of the last flush
+            return self.db.summary(self.date_code).to_json()
+        with self._collected():
+            return self.summary.to_json()
+
+    # --- flushing ---
+    def flush(self, pretty=False):
+        # pretty only for the last flush, which leaves the summary people read
+        with self.flush_lock, metrics.timer("bms_checkpoint_seconds"):
+            with self._collected():
+                movie_summary = self.summary.to_json() if self.db is None else None
+                processed = list(self.processed_venues)
+                polled, self.polled = self.polled, {}
+                fetched_text = dumps(list(self.fetched_venues))
+                processed_text = dumps(processed)
+                fetched_count = len(self.fetched_venues)
+                entries, self.unlogged = self.unlogged, array("I")
+                compact = self.db is None and (
+                    self.index_stale or self.index.log_entries + len(entries) > RESUME_COMPACT_EVERY
                 )
+                if compact:
+                    resume = set(self.fetched_venues), set(processed)
+                    self.index_stale = False
+                new_count = self.new_since_flush
+                self.pending = 0
+                self.new_since_flush = 0
+                version = self.version
+
+                dead_letter_text = dumps(self.dead_letter, pretty)
+
+            # show rows go out first: every venue in this checkpoint already
+            # appended its rows before add_venue()
+            drained = None
+            if self.show_table is not None:
+                drained = self.show_table.drain()
+            if drained is not None:
+                self.show_table.write_part(self.date_code, drained, self.shows_dir)
+                compact_parts(self.date_code, self.shows_dir, SHOWS_COMPACT_PARTS)
+            if self.db is not None:
+                self.db.write(self.date_code, drained, processed, polled, self.registry)
+                # movie_summary.json is a view of the database from here on
+                movie_summary = self.db.summary(self.date_code).to_json()
+            summary_text = dumps(movie_summary, pretty)
+
+            # the swap of CHECKPOINT_FILE is the commit point: the summary and
+            # the venue sets it counts go in together or not at all, and a
+            # restart reads them from it. The separate files after it are
+            # exports for people, report.py and --merge.
+            path = self.path(CHECKPOINT_FILE)
+            os.replace(
+                write_json_tmp(path, checkpoint_text(summary_text, fetched_text, processed_text, dead_letter_text)),
+                path,
+            )
+            files = {
+                "movie_summary.json": summary_text,
+                "fetchedvenues.json": fetched_text,
+                "processed_venues.json": processed_text,
+                "dead_letter.json": dead_letter_text,
+            }
+            if self.series.dirty:
+                self.series.save(self.path(SALES_SERIES))
+                files[VELOCITY_REPORT] = dumps(self.series.report(), pretty)
+            for name, text in files.items():
+                os.replace(write_json_tmp(self.path(name), text), self.path(name))
+            if compact:
+                self.index.write(*resume)
+            elif self.db is None:
+                self.index.append(entries)
+            # the cache index follows the checkpoint, so a crash leaves it
+            # missing at most the bodies of the venues still to be recorded
+            if cache is not None and cache.dirty:
+                cache.save()
+            self.flushed_version = version
 
-                # --- Update chain-level ---
-            chain = shows[0].get("chain", "Unknown")
+        print(
+            f"💾 Progress dumped ({self.date_code}). Venues: {fetched_count} (New added: {new_count})"
+        )
 
-            chain_block = None
-            for d in movie_summary[movie]["Chain_details"]:
-                if d["chain"] == chain:
-                    chain_block = d
-                    break
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            with self.lock:
+                pending = self.pending
+            if pending:
+                self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush(pretty=True)
+        if self.show_table is not None:
+            with self.flush_lock:
+                compact_parts(self.date_code, self.shows_dir)
+
+
+# ---------------- RATE LIMIT ----------------
+def parse_retry_after(value):
+    # seconds, or an HTTP date; None if absent or unreadable
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(RETRY_AFTER_MAX, max(0.0, seconds))
+
+
+class TokenBucket:
+    """Request rate shared by every worker: `rate` tokens a second, at most
+    `burst` saved up.
+
+    A 429 or 503 halves the rate (at most once per RATE_DECREASE_INTERVAL)
+    and a Retry-After pauses every request until it has passed; each clean
+    response then wins back RATE_RECOVERY_STEP of the configured rate.
+    `budget` caps the network requests of the whole run (0: no cap).
+    """
+
+    def __init__(self, rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST, budget=REQUEST_BUDGET):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.budget = budget
+        self.spent = 0
+        self.exhausted = False
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        # seconds until the reserved request may go, None once over budget
+        with self.lock:
+            over = self.budget and self.spent >= self.budget
+            if over:
+                announce, self.exhausted = not self.exhausted, True
+            else:
+                self.spent += 1
+                now_ts = time.monotonic()
+                delay = max(0.0, self.paused_until - now_ts)
+                if self.rate > 0:
+                    self.tokens = min(self.burst, self.tokens + (now_ts - self.updated) * self.rate)
+                    self.updated = now_ts
+                    self.tokens -= 1
+                    if self.tokens < 0:
+                        delay = max(delay, -self.tokens / self.rate)
+        if over:
+            if announce:
+                print(f"💸 Request budget of {self.budget} spent; the rest is left for the next run")
+            return None
+        return delay
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+        return delay is not None
+
+    async def acquire_async(self):
+        delay = self._reserve()
+        if delay:
+            await asyncio.sleep(delay)
+        return delay is not None
+
+    def observe(self, status, retry_after=None):
+        if status not in (429, 503):
+            with self.lock:
+                if self.rate < self.max_rate:
+                    self.rate = min(self.max_rate, self.rate + RATE_RECOVERY_STEP)
+            metrics.set("bms_rate_limit", self.rate)
+            return
 
-            if chain_block is None:
-                chain_block = {
-                    "chain": chain,
-                    "venues": 0,
-                    "shows": 0,
-                    "gross": 0.0,
-                    "sold": 0,
-                    "totalSeats": 0,
-                    "fastfilling": 0,
-                    "housefull": 0,
-                    "occupancy": 0.0,
-                }
-                movie_summary[movie]["Chain_details"].append(chain_block)
+        metrics.inc("bms_throttled_total")
+        pause = parse_retry_after(retry_after)
+        with self.lock:
+            now_ts = time.monotonic()
+            if pause:
+                self.paused_until = max(self.paused_until, now_ts + pause)
+            if now_ts - self.last_decrease < RATE_DECREASE_INTERVAL or not self.rate:
+                return
+            self.last_decrease = now_ts
+            self.rate = max(RATE_LIMIT_FLOOR, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)  # no burst straight after a pause
+            rate = self.rate
+        metrics.set("bms_rate_limit", rate)
+        print(
+            f"🐢 Throttled ({status}), slowing to {rate:.1f} req/s"
+            + (f" after a {pause:.0f}s pause" if pause else "")
+        )
 
-            chain_block["venues"] += 1
 
-            for show in shows:
-                sold = show["sold"]
-                total = show["total"]
-                occ = (sold / total * 100) if total > 0 else 0
+# ---------------- RETRIES ----------------
+def retry_delay(attempt):
+    # exponential backoff with full jitter
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
 
-                chain_block["shows"] += 1
-                chain_block["gross"] += show["gross"]
-                chain_block["sold"] += sold
-                chain_block["totalSeats"] += total
 
-                if 50 <= occ < 98:
-                    chain_block["fastfilling"] += 1
-                elif occ >= 98:
-                    chain_block["housefull"] += 1
+class CircuitBreaker:
+    """Pauses every worker for BREAKER_COOLDOWN seconds after MAX_ERRORS
+    consecutive failures, instead of restarting the process."""
 
-            if chain_block["totalSeats"] > 0:
-                chain_block["occupancy"] = round(
-                    chain_block["sold"] / chain_block["totalSeats"] * 100, 2
-                )
+    def __init__(self, threshold=MAX_ERRORS, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
 
-    # --- Update movie-level occupancy after processing ---
-    for movie, data in movie_summary.items():
-        if data["totalSeats"] > 0:
-            data["occupancy"] = round(data["sold"] / data["totalSeats"] * 100, 2)
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
 
-    # --- Update movie-level stats & sort city blocks ---
-    for movie, data in movie_summary.items():
-        if data["totalSeats"] > 0:
-            data["occupancy"] = round(data["sold"] / data["totalSeats"] * 100, 2)
-        else:
-            data["occupancy"] = 0.0
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.failures = 0
+                self.open_until = time.monotonic() + self.cooldown
+                print(f"🛑 Too many errors. Pausing all workers for {self.cooldown}s...")
 
-        # sort city blocks by gross (high → low)
-        if "details" in data:
-            data["details"] = sorted(
-                data["details"], key=lambda x: x["gross"], reverse=True
-            )
+    def wait_time(self):
+        with self.lock:
+            return max(0.0, self.open_until - time.monotonic())
 
-    # Save updated movie summary
-    with open("movie_summary.json.tmp", "w", encoding="utf-8") as f:
-        json.dump(movie_summary, f, indent=2, ensure_ascii=False)
-    os.replace("movie_summary.json.tmp", "movie_summary.json")
+    def wait(self):
+        delay = self.wait_time()
+        if delay:
+            time.sleep(delay)
 
-    # Save fetched venues
-    with open("fetchedvenues.json.tmp", "w", encoding="utf-8") as f:
-        json.dump(list(fetched_venues), f, indent=2)
-    os.replace("fetchedvenues.json.tmp", "fetchedvenues.json")
 
-    # Save processed venues
-    processed_venues |= new_venues
-    with open("processed_venues.json.tmp", "w", encoding="utf-8") as f:
-        json.dump(list(processed_venues), f, indent=2)
-    os.replace("processed_venues.json.tmp", "processed_venues.json")
+class RetryQueue:
+    """Delay queue of (venue, date, attempt) work items waiting for their
+    backoff."""
 
-    print(
-        f"💾 Progress dumped. Venues: {len(fetched_venues)} (New added: {len(new_venues)})"
-    )
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
 
+    def __len__(self):
+        return len(self._heap)
 
-# ---------------- FETCH SAFE ----------------
-def fetch_venue_safe(venue_code):
-    global error_count
-    with lock:
-        if venue_code in fetched_venues:
+    def push(self, venue_code, date_code, attempt):
+        if attempt >= MAX_ATTEMPTS:
+            checkpoints[date_code].add_dead_letter(venue_code, attempt)
             return
+        self._seq += 1
+        due = time.monotonic() + retry_delay(attempt)
+        heapq.heappush(self._heap, (due, self._seq, venue_code, date_code, attempt))
 
-    data = fetch_data(venue_code)
-    if data is None:  # real error
-        with lock:
-            error_count += 1
-            if error_count >= MAX_ERRORS:
-                print("🛑 Too many errors. Restarting...")
-                dump_progress(all_data, fetched_venues)
-                time.sleep(0.5)
-                os.execv(sys.executable, ["python"] + sys.argv)
-    else:
-        with lock:
-            if venue_code not in all_data:
-                all_data[venue_code] = {}
-            # Only add to summary if non-empty
-            if data:
-                for movie, shows in data.items():
-                    all_data[venue_code][movie] = shows
-            fetched_venues.add(venue_code)
-            print(
-                f"✅ Successfully fetched venue: {venue_code} ({len(fetched_venues)} fetched so far)"
-            )
-            dump_progress(all_data, fetched_venues)
+    def pop_due(self):
+        now_ts = time.monotonic()
+        while self._heap and self._heap[0][0] <= now_ts:
+            _, _, venue_code, date_code, attempt = heapq.heappop(self._heap)
+            yield venue_code, date_code, attempt
 
+    def next_due_in(self):
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
 
-# ---------------- MAIN ----------------
-if __name__ == "__main__":
-    with open("venues.json", "r", encoding="utf-8") as f:
-        venues = json.load(f)
 
-    if os.path.exists("fetchedvenues.json"):
-        with open("fetchedvenues.json", "r", encoding="utf-8") as f:
-            fetched_venues = set(json.load(f))
-    else:
-        fetched_venues = set()
+breaker = CircuitBreaker()
+limiter = TokenBucket()
+venue_stats = None  # VenueStats, fed by every fetched venue
+checkpoints = {}  # date_code -> CheckpointWriter
+pipeline = None  # ParsePipeline when --parse-workers is set
 
-    if os.path.exists("venues_data.json"):
-        with open("venues_data.json", "r", encoding="utf-8") as f:
-            try:
-                all_data = json.load(f)
-            except:
-                all_data = {}
-    else:
-        all_data = {}
 
-    print(
-        f"🚀 Starting fetch with {NUM_WORKERS} workers. Already fetched: {len(fetched_venues)} venues"
-    )
+# ---------------- FETCH SAFE ----------------
+def fetch_venue_safe(venue_code, date_code):
+    if checkpoints[date_code].is_fetched(venue_code):
+        return True
 
-    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
-        futures = [executor.submit(fetch_venue_safe, vcode) for vcode in venues.keys()]
-        for _ in as_completed(futures):
-            pass
+    breaker.wait()
+    return record_result(venue_code, date_code, fetch_payload(venue_code, date_code))
 
-    # Instead, load the final updated movie_summary.json
-    with open("movie_summary.json", "r", encoding="utf-8") as f:
-        movie_summary = json.load(f)
 
-    df = pd.DataFrame([{"Movie": k, **v} for k, v in movie_summary.items()])
-    df = df.sort_values(by="gross", ascending=False).reset_index(drop=True)
-    df.to_csv("movie_summary.csv", index=False)
+def parse_result(venue_code, date_code, body, dates):
+    # (date_code, movies) for every swept date this body answers, the
+    # requested date last
+    with metrics.timer("bms_parse_seconds"):
+        movies = parse_body(venue_code, body, date_code)
+    results = []
 
-    def pretty_divider(title=""):
-        line = "─" * 25
-        if title:
-            print(f"\n{line} ✦ {title} ✦ {line}\n")
-        else:
-            print(f"\n{line} ✦ {line}\n")
+    # the API answers with its next show date when a venue has nothing on
+    # date_code; that payload already covers every swept date up to it
+    api_date = body_date(body) if not movies else None
+    if api_date is not None and api_date > date_code:
+        results += [(other, {}) for other in dates if date_code < other < api_date]
+        if api_date in dates:
+            results.append((api_date, parse_body(venue_code, body, api_date)))
 
-    # ------------------------------------------------------
-    # Language-wise Summary
-    # ------------------------------------------------------
-    pretty_divider("Language-wise Summary")
+    results.append((date_code, movies))
+    return results
 
-    console_rows = []
-    lang_summary = {}
 
-    for movie, stats in movie_summary.items():
-        # Split "Title [Dimension | Language]" back into title + language
-        if "[" in movie and "|" in movie:
-            base_title = movie.split("[")[0].strip()
-            lang = movie.split("|")[-1].replace("]", "").strip()
-        else:
-            base_title = movie.strip()
-            lang = "Unknown"
+def record_result(venue_code, date_code, body):
+    if body is OVER_BUDGET:  # left unfetched for the next run
+        return True
+    if body is None:  # real error
+        breaker.record_failure()
+        return False
+
+    if pipeline is not None:
+        breaker.record_success()
+        pipeline.submit(venue_code, date_code, body)
+        return True
+
+    try:
+        results = parse_result(venue_code, date_code, body, tuple(checkpoints))
+    except Exception as e:
+        return parse_failed(venue_code, date_code, e)
+    breaker.record_success()
+    record_parsed(venue_code, date_code, [(d, movies, None) for d, movies in results])
+    return True
+
+
+def parse_failed(venue_code, date_code, error):
+    # a 200 that isn't showtimes JSON (a challenge page, a truncated body) is
+    # a failed attempt like any other: retried, and never served from cache
+    print(f"⚠️ Failed to parse {venue_code} [{date_code}]: {error}")
+    metrics.inc("bms_parse_errors_total")
+    if cache is not None:
+        cache.drop(cache_key(venue_code, date_code))
+    breaker.record_failure()
+    return False
+
+
+def record_parsed(venue_code, date_code, results):
+    for other, movies, venue_summary in results:
+        if other != date_code and checkpoints[other].is_fetched(venue_code):
+            continue
+        record_venue(venue_code, other, movies, venue_summary)
+
+
+def record_venue(venue_code, date_code, movies, venue_summary=None):
+    writer = checkpoints[date_code]
+    if movies:
+        writer.registry.set_chain(venue_code, next(iter(movies.values()))[0].chain)
+        if writer.show_table is not None:
+            writer.show_table.append_venue(movies)
+    writer.add_venue(venue_code, movies, venue_summary)
+    if venue_stats is not None:
+        venue_stats.observe(venue_code, movies)
+    metrics.inc("bms_venues_total")
+    say(
+        f"✅ Successfully fetched venue: {venue_code} [{date_code}] ({len(writer.fetched_venues)} fetched so far)"
+    )
 
-        key = (base_title, lang)
 
-        if key not in lang_summary:
-            lang_summary[key] = {"shows": 0, "gross": 0.0, "sold": 0, "totalSeats": 0}
+def date_chains(work):
+    # venue_code -> iterator over its dates, earliest first. A venue's next
+    # date is only queued once the one before has answered: an answer with
+    # a later show date already covers the dates up to it.
+    chains = defaultdict(list)
+    for vcode, date in work:
+        chains[vcode].append(date)
+    return {vcode: iter(sorted(dates)) for vcode, dates in chains.items()}
 
-        lang_summary[key]["shows"] += stats["shows"]
-        lang_summary[key]["gross"] += stats["gross"]
-        lang_summary[key]["sold"] += stats["sold"]
-        lang_summary[key]["totalSeats"] += stats["totalSeats"]
 
-    for (title, lang), stats in lang_summary.items():
-        occ = (
-            round(stats["sold"] / stats["totalSeats"] * 100, 2)
-            if stats["totalSeats"]
-            else 0
+def run_thread_sweep(work):
+    retries = RetryQueue()
+    chains = date_chains(work)
+    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        pending = {}
+
+        def advance(vcode):
+            date = next(chains[vcode], None)
+            if date is not None:
+                pending[executor.submit(fetch_venue_safe, vcode, date)] = (vcode, date, 0)
+
+        for vcode in chains:
+            advance(vcode)
+        while pending or retries:
+            done, _ = wait(
+                pending, timeout=retries.next_due_in(), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                vcode, date, attempt = pending.pop(future)
+                recorded = future.result()
+                if not recorded:
+                    retries.push(vcode, date, attempt + 1)
+                if recorded or attempt + 1 >= MAX_ATTEMPTS:  # answered or dead-lettered
+                    advance(vcode)
+            for vcode, date, attempt in retries.pop_due():
+                pending[executor.submit(fetch_venue_safe, vcode, date)] = (vcode, date, attempt)
+            metrics.set("bms_queue_depth", len(pending), queue="fetch")
+            metrics.set("bms_queue_depth", len(retries), queue="retry")
+
+
+# ---------------- PARSE POOL ----------------
+def parse_job(venue_code, date_code, body, dates, city, state):
+    # runs in a parse worker process: decoding, the show loop and the venue's
+    # own rollups, so fetch threads only ever move bytes
+    # the worker's own Metrics never reach the parent, so the parse time
+    # travels back with the results
+    started = time.perf_counter()
+    results = []
+    for other, movies in parse_result(venue_code, date_code, body, dates):
+        venue_summary = MovieSummary()
+        venue_summary.add_venue(city, state, movies)
+        results.append((other, dict(movies), venue_summary))
+    return time.perf_counter() - started, results
+
+
+def init_parse_worker(verbose, stream_parse):
+    set_verbose(verbose)
+    set_stream_parse(stream_parse)
+
+
+class ParsePipeline:
+    """CPU stage of a sweep.
+
+    Fetchers submit() raw bodies to a process pool; at most `depth` bodies
+    are queued or being parsed at once, after which submit() blocks the
+    fetcher. One reducer thread records every parsed venue, merging the
+    per-venue partials the workers return into the checkpoints.
+    """
+
+    def __init__(self, registry, workers=PARSE_WORKERS, depth=PARSE_QUEUE_DEPTH):
+        self.registry = registry
+        # spawn, not fork: the checkpoint and fetch threads are already running
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_parse_worker,
+            initargs=(VERBOSE, STREAM_PARSE_BYTES),
         )
-        atp = round(stats["gross"] / stats["sold"], 2) if stats["sold"] else 0
-        rgross = format_rgross(stats["gross"])
-        console_rows.append(
-            {
-                "Movie (Lang)": f"{title} ({lang})",
-                "Shows": stats["shows"],
-                "Gross": round(stats["gross"], 2),
-                "Sold": stats["sold"],
-                "TotalSeats": stats["totalSeats"],
-                "ATP": atp,
-                "Occ%": occ,
-                "RGross": rgross,
-            }
+        self.slots = threading.BoundedSemaphore(depth)
+        self.parsed = queue.Queue()
+        self._reducer = threading.Thread(target=self._reduce, daemon=True)
+        self._reducer.start()
+
+    def submit(self, venue_code, date_code, body):
+        self.slots.acquire()
+        metrics.add("bms_queue_depth", 1, queue="parse")
+        city, state = self.registry.location(venue_code)
+        future = self.pool.submit(
+            parse_job, venue_code, date_code, body, tuple(checkpoints), city, state
         )
+        future.add_done_callback(lambda f: self.parsed.put((venue_code, date_code, f)))
+
+    def _reduce(self):
+        while True:
+            item = self.parsed.get()
+            if item is None:
+                return
+            venue_code, date_code, future = item
+            self.slots.release()
+            metrics.add("bms_queue_depth", -1, queue="parse")
+            try:
+                elapsed, results = future.result()
+            except Exception as e:
+                print(f"⚠️ Failed to parse {venue_code}: {e}")
+                if cache is not None:
+                    cache.drop(cache_key(venue_code, date_code))
+                checkpoints[date_code].add_dead_letter(venue_code, 1)
+                continue
+            metrics.observe("bms_parse_seconds", elapsed)
+            record_parsed(venue_code, date_code, results)
+
+    def close(self):
+        # every submitted body is parsed and recorded before this returns
+        self.pool.shutdown(wait=True)
+        self.parsed.put(None)
+        self._reducer.join()
+
+
+# ---------------- POLLING ----------------
+POLL_MIN_INTERVAL = 120  # seconds between polls of the busiest venues
+POLL_MAX_INTERVAL = 1800  # ... and of the quietest ones
+POLL_FILL_STEPS = 20  # aim for ~1/20th of the remaining seats selling between polls
+POLL_IDLE = 5  # scheduler wake-up when nothing is due
+
+
+def show_start(date_code, show_time):
+    if not show_time:
+        return None
+    day = datetime.strptime(str(date_code), "%Y%m%d")
+    for fmt in ("%I:%M %p", "%H:%M"):
+        try:
+            t = datetime.strptime(str(show_time).strip(), fmt)
+        except ValueError:
+            continue
+        return day.replace(hour=t.hour, minute=t.minute, tzinfo=IST)
+    return None
+
+
+def next_poll_in(date_code, old, new, elapsed):
+    # seconds until the venue is worth polling again, or None once every show
+    # has started and its numbers can no longer change
+    now_ts = datetime.now(IST)
+    upcoming = []
+    for shows in new.values():
+        for show in shows:
+            start = show_start(date_code, show.time)
+            if start is None or start > now_ts:
+                upcoming.append((start, show))
+    if not upcoming:
+        return None
 
-    df_console = pd.DataFrame(console_rows)
-    df_console = df_console.sort_values(by="Gross", ascending=False).reset_index(
-        drop=True
-    )
-    print(df_console.to_string(index=False))
+    interval = POLL_MAX_INTERVAL
 
-    # ------------------------------------------------------
-    # Movie-wise Summary
-    # ------------------------------------------------------
-    pretty_divider("Movie-wise Summary")
+    # soonest showtime: a few polls in the run-up to it
+    starts = [start for start, _ in upcoming if start is not None]
+    if starts:
+        interval = min(interval, (min(starts) - now_ts).total_seconds() / 4)
 
-    movie_only_rows = []
-    movie_only_summary = {}
+    if old is not None and elapsed:
+        before = {s.session_id: s.sold for shows in old.values() for s in shows}
+        sold_delta = sum(
+            max(0, show.sold - before.get(show.session_id, 0))
+            for _, show in upcoming
+        )
+        if sold_delta:
+            # recently changed: at least twice as often as a quiet venue
+            interval = min(interval, POLL_MAX_INTERVAL / 2)
+            # fast-filling: in step with the rate the remaining seats go
+            remaining = sum(show.available for _, show in upcoming)
+            rate = sold_delta / elapsed
+            interval = min(interval, remaining / rate / POLL_FILL_STEPS)
+
+    return max(POLL_MIN_INTERVAL, interval)
+
+
+def poll_venue(venue_code, date_code, last_polled):
+    writer = checkpoints[date_code]
+    breaker.wait()
+    # only a venue already applied this run has movies to fall back on; the
+    # cache may hold its body from an earlier run or a failed first poll
+    body = fetch_payload(venue_code, date_code, skip_unchanged=venue_code in writer.snapshots)
+    if body is OVER_BUDGET:
+        return None
+    if body is None:
+        breaker.record_failure()
+        return POLL_MIN_INTERVAL
+
+    elapsed = time.monotonic() - last_polled if last_polled else None
+    if body is UNCHANGED:
+        # byte-identical to the last poll: nothing to parse or re-aggregate
+        movies = writer.snapshots.get(venue_code)
+        if movies is not None:
+            breaker.record_success()
+            writer.series.observe(venue_code, *writer.registry.location(venue_code), movies, time.time())
+            return next_poll_in(date_code, movies, movies, elapsed)
+        # reset() dropped the snapshot since: apply the cached body after all
+        body = cache.read(cache_key(venue_code, date_code))
+        if body is None:
+            return POLL_MIN_INTERVAL
+
+    fetched_at = time.time()
+    try:
+        movies = parse_body(venue_code, body, date_code)
+    except Exception as e:
+        parse_failed(venue_code, date_code, e)
+        return POLL_MIN_INTERVAL
+    breaker.record_success()
+    if movies:
+        writer.registry.set_chain(venue_code, next(iter(movies.values()))[0].chain)
+        if writer.show_table is not None:
+            writer.show_table.append_venue(movies, fetched_at)
+    old = writer.replace_venue(venue_code, movies, fetched_at)
+    writer.series.observe(venue_code, *writer.registry.location(venue_code), movies, fetched_at)
+    if venue_stats is not None:
+        venue_stats.observe(venue_code, movies)
+    metrics.inc("bms_venues_total")
+
+    interval = next_poll_in(date_code, old, movies, elapsed)
+    if interval is None:
+        say(f"🏁 {venue_code} [{date_code}] has no upcoming shows, no more polls")
+    else:
+        say(f"🔁 Polled {venue_code} [{date_code}], next in {int(interval)}s")
+    return interval
 
-    for movie, stats in movie_summary.items():
-        if "[" in movie:
-            base_title = movie.split("[")[0].strip()
-        else:
-            base_title = movie.strip()
-
-        if base_title not in movie_only_summary:
-            movie_only_summary[base_title] = {
-                "shows": 0,
-                "gross": 0.0,
-                "sold": 0,
-                "totalSeats": 0,
-            }
 
-        movie_only_summary[base_title]["shows"] += stats["shows"]
-        movie_only_summary[base_title]["gross"] += stats["gross"]
-        movie_only_summary[base_title]["sold"] += stats["sold"]
-        movie_only_summary[base_title]["totalSeats"] += stats["totalSeats"]
+def run_poll(work):
+    for writer in checkpoints.values():
+        writer.reset()
 
-    for title, stats in movie_only_summary.items():
-        occ = (
-            round(stats["sold"] / stats["totalSeats"] * 100, 2)
-            if stats["totalSeats"]
-            else 0
-        )
-        atp = round(stats["gross"] / stats["sold"], 2) if stats["sold"] else 0
-        rgross = format_rgross(stats["gross"])
-        movie_only_rows.append(
-            {
-                "Movie": title,
-                "Shows": stats["shows"],
-                "Gross": round(stats["gross"], 2),
-                "Sold": stats["sold"],
-                "TotalSeats": stats["totalSeats"],
-                "ATP": atp,
-                "Occ%": occ,
-                "RGross": rgross,
-            }
+    schedule = []  # (due, seq, venue_code, date_code)
+    last_polled = {}
+    seq = 0
+    started = time.monotonic()
+    for vcode, date in work:
+        seq += 1
+        heapq.heappush(schedule, (started, seq, vcode, date))
+
+    with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+        in_flight = {}
+        while schedule or in_flight:
+            now_ts = time.monotonic()
+            while (
+                schedule
+                and schedule[0][0] <= now_ts
+                and len(in_flight) < NUM_WORKERS * 2
+            ):
+                _, _, vcode, date = heapq.heappop(schedule)
+                future = executor.submit(
+                    poll_venue, vcode, date, last_polled.get((vcode, date))
+                )
+                in_flight[future] = (vcode, date)
+
+            timeout = POLL_IDLE
+            if schedule:
+                timeout = min(timeout, max(0.0, schedule[0][0] - now_ts))
+            metrics.set("bms_queue_depth", len(schedule), queue="scheduled")
+            metrics.set("bms_queue_depth", len(in_flight), queue="in_flight")
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = in_flight.pop(future)
+                last_polled[key] = time.monotonic()
+                interval = future.result()
+                if interval is not None:
+                    seq += 1
+                    heapq.heappush(schedule, (time.monotonic() + interval, seq, *key))
+
+
+# ---------------- READ API ----------------
+API_PORT = 0  # --api-port; 0 leaves the API off
+API_HOST = "127.0.0.1"  # --api-host; 0.0.0.0 to serve dashboards off the box
+API_REFRESH = 2.0  # seconds a view is served before it is rebuilt from the aggregates
+API_PAGE_SIZE = 50
+API_MAX_PAGE = 500
+API_SORT_KEYS = ("gross", "sold", "shows", "occupancy", "totalSeats")
+
+
+def rollup_rows(blocks, key_names, venues=True):
+    # (key, block) pairs -> rows with rupee gross and derived fields; blocks
+    # sharing a key are summed. venues=False drops the venue count, which
+    # stops meaning anything once several movies' blocks are added up
+    merged = {}
+    for key, block in blocks:
+        target = merged.get(key)
+        if target is None:
+            merged[key] = target = dict(zip(key_names, key), **{field: 0 for field in COUNTERS})
+        for field in COUNTERS:
+            target[field] += block[field]
+    rows = []
+    for row in merged.values():
+        if not venues:
+            del row["venues"]
+        row["gross"] /= 100
+        row["occupancy"] = occupancy(row)
+        row["atp"] = round(row["gross"] / row["sold"], 2) if row["sold"] else 0.0
+        rows.append(row)
+    return rows
+
+
+class SummaryViews:
+    """One date's rollups as of one summary version, each pre-sorted on
+    every API_SORT_KEYS field, so a request is a slice."""
+
+    def __init__(self, date_code, version, summary):
+        self.date_code = date_code
+        self.version = version
+        self.built_at = time.time()
+        meta = summary.meta
+        rows = {
+            "movies": rollup_rows(
+                (((movie,), block) for movie, block in summary.movies.items()), ("movie",)
+            ),
+            "cities": rollup_rows(
+                (((state, city), block) for (_, state, city), block in summary.cities.items()),
+                ("state", "city"),
+                venues=False,
+            ),
+            "chains": rollup_rows(
+                (((chain,), block) for (_, chain), block in summary.chains.items()),
+                ("chain",),
+                venues=False,
+            ),
+            "languages": rollup_rows(
+                (
+                    ((meta.get(movie, {}).get("language") or "Unknown",), block)
+                    for movie, block in summary.movies.items()
+                ),
+                ("language",),
+                venues=False,
+            ),
+        }
+        for row in rows["movies"]:
+            row.update(meta.get(row["movie"], {}))
+        self.sorted = {
+            name: {key: sorted(items, key=lambda r, k=key: r[k], reverse=True) for key in API_SORT_KEYS}
+            for name, items in rows.items()
+        }
+        # a movie's own city and chain blocks, for ?movie=; rows are only
+        # built for the movies asked about
+        self.summary = summary
+        self.by_movie = {}
+
+    def movie_rows(self, name, movie):
+        rows = self.by_movie.get((name, movie))
+        if rows is None:
+            blocks = self.summary.cities if name == "cities" else self.summary.chains
+            key_names = ("state", "city") if name == "cities" else ("chain",)
+            rows = self.by_movie[(name, movie)] = rollup_rows(
+                ((key[1:], block) for key, block in blocks.items() if key[0] == movie), key_names
+            )
+        return rows
+
+    def page(self, name, sort="gross", order="desc", offset=0, limit=API_PAGE_SIZE, movie=None):
+        if movie is not None:
+            items = sorted(self.movie_rows(name, movie), key=lambda r: r[sort], reverse=True)
+        else:
+            items = self.sorted[name][sort]
+        total = len(items)
+        if order == "asc":
+            start = max(0, total - offset - limit)
+            chunk = items[start : total - offset][::-1] if offset < total else []
+        else:
+            chunk = items[offset : offset + limit]
+        return {
+            "date_code": self.date_code,
+            "version": self.version,
+            "as_of": datetime.fromtimestamp(self.built_at, IST).isoformat(timespec="seconds"),
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "items": chunk,
+        }
+
+
+class LiveViews:
+    """SummaryViews per date, rebuilt from the writer's aggregates at most
+    every API_REFRESH seconds and only when they have changed."""
+
+    def __init__(self, writers):
+        self.writers = writers
+        self.views = {}
+        self.lock = threading.Lock()
+
+    def get(self, date_code):
+        writer = self.writers[date_code]
+        with self.lock:
+            views = self.views.get(date_code)
+            fresh = views is not None and (
+                time.time() - views.built_at < API_REFRESH
+                or views.version == (writer.flushed_version if writer.db is not None else writer.version)
+            )
+            if not fresh:
+                with metrics.timer("bms_api_build_seconds"):
+                    views = self.views[date_code] = SummaryViews(date_code, *writer.snapshot())
+            return views
+
+
+def serve_api(writers, port, host=API_HOST):
+    # read-only JSON over the in-memory aggregates:
+    #   /dates
+    #   /movies, /cities, /chains, /languages
+    #     ?date=YYYYMMDD&sort=gross|sold|shows|occupancy|totalSeats&order=desc|asc
+    #     &offset=0&limit=50, and movie=<movie> on /cities and /chains
+    # every response carries an ETag; If-None-Match gets a bodiless 304
+    live = LiveViews(writers)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            name = url.path.strip("/")
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            try:
+                if name == "dates":
+                    body = {
+                        "dates": [
+                            {"date_code": d, "venues": len(w.fetched_venues), "version": w.version}
+                            for d, w in writers.items()
+                        ]
+                    }
+                    self.reply(200, body)
+                    return
+                if name not in ("movies", "cities", "chains", "languages"):
+                    self.send_error(404)
+                    return
+                date_code = int(query.get("date", next(iter(writers))))
+                sort = query.get("sort", "gross")
+                order = query.get("order", "desc")
+                offset = max(0, int(query.get("offset", 0)))
+                limit = min(API_MAX_PAGE, max(1, int(query.get("limit", API_PAGE_SIZE))))
+                movie = query.get("movie") if name in ("cities", "chains") else None
+                if date_code not in writers or sort not in API_SORT_KEYS or order not in ("asc", "desc"):
+                    raise ValueError(url.query)
+            except ValueError:
+                self.send_error(400)
+                return
+
+            metrics.inc("bms_api_requests_total", endpoint=name)
+            views = live.get(date_code)
+            etag = '"{}-{}-{:08x}"'.format(date_code, views.version, zlib.crc32(self.path.encode()))
+            if etag in self.headers.get("If-None-Match", ""):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.reply(200, views.page(name, sort, order, offset, limit, movie), etag)
+
+        def reply(self, status, obj, etag=None):
+            body = dumps(obj)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", f"max-age={int(API_REFRESH)}")
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🌐 Read API on http://{host}:{server.server_port}/movies")
+    return server
+
+
+# ---------------- SELECTION & SHARDS ----------------
+def parse_shard(spec):
+    index, _, count = spec.partition("/")
+    index, count = int(index), int(count)
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError("--shard is i/N with 0 <= i < N")
+    return index, count
+
+
+def parse_bbox(spec):
+    south, west, north, east = (float(v) for v in spec.split(","))
+    return south, west, north, east
+
+
+def shard_of(venue_code, count):
+    # stable across processes and machines, unlike hash()
+    return zlib.crc32(venue_code.encode()) % count
+
+
+def select_venues(registry, args):
+    selected = None
+    for values, lookup in (
+        (args.state, registry.in_state),
+        (args.city, registry.in_city),
+        (args.region, registry.in_region),
+    ):
+        if values:
+            matched = {code for value in values for code in lookup(value)}
+            selected = matched if selected is None else selected & matched
+    if args.bbox:
+        matched = set(registry.in_bbox(*args.bbox))
+        selected = matched if selected is None else selected & matched
+
+    codes = [code for code in registry if selected is None or code in selected]
+    if args.shard:
+        index, count = args.shard
+        codes = [code for code in codes if shard_of(code, count) == index]
+    return codes
+
+
+def merge_outputs(roots, dates, out_root):
+    # combine the per-shard state/<shard>/<date>/ outputs into out_root/<date>/
+    for date_code in dates:
+        parts = []
+        fetched, processed, dead_letter = set(), set(), {}
+        for root in roots:
+            part_dir = os.path.join(root, str(date_code))
+            checkpoint = load_checkpoint(part_dir)
+            part_processed = set(checkpoint["processed"])
+            overlap = processed & part_processed
+            if overlap:
+                print(f"⚠️ {len(overlap)} venues appear in more than one shard for {date_code}, skipping {part_dir}")
+                continue
+            parts.append(MovieSummary.from_json(checkpoint["summary"]))
+            processed |= part_processed
+            fetched |= set(checkpoint["fetched"])
+            dead_letter.update(checkpoint["dead_letter"])
+
+        out_dir = os.path.join(out_root, str(date_code))
+        os.makedirs(out_dir, exist_ok=True)
+        movie_summary = merge_summaries(parts).to_json()
+        files = {
+            "movie_summary.json": dumps(movie_summary, pretty=True),
+            "fetchedvenues.json": dumps(list(fetched)),
+            "processed_venues.json": dumps(list(processed)),
+            "dead_letter.json": dumps(dead_letter, pretty=True),
+        }
+        files = {CHECKPOINT_FILE: checkpoint_text(*files.values()), **files}
+        for name, text in files.items():
+            path = os.path.join(out_dir, name)
+            os.replace(write_json_tmp(path, text), path)
+        # the merged JSON is newer than any resume index left in out_dir
+        for name in (RESUME_INDEX, RESUME_LOG):
+            if os.path.exists(os.path.join(out_dir, name)):
+                os.remove(os.path.join(out_dir, name))
+        import report
+
+        report.save_summary_csv(
+            report.summary_frame(movie_summary), os.path.join(out_dir, "movie_summary.csv")
         )
+        print(f"🧩 Merged {len(roots)} shard(s) for {date_code}: {len(processed)} venues -> {out_dir}")
+
+
+# ---------------- SCHEDULING ----------------
+VENUE_STATS = "venue_stats.json"  # under the --state-dir root, shared by shards and dates
+STATS_WEIGHT = 0.5  # weight of the newest observation in a venue's running averages
+CITY_TIERS = ((50, 3.0), (10, 2.0), (0, 1.0))  # (venues in the city, weight), largest first
+PREMIUM_FORMATS = ("IMAX", "4DX", "MX4D", "ICE", "7D", "SCREENX")
+
+
+class VenueStats:
+    """Running averages of each venue's gross and show count across runs,
+    used to fetch the venues that matter most first."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.venues = load_json(path, {}) if path is not None else {}  # code -> [gross, shows]
+        self.updated = {}
+        self.lock = threading.Lock()
+
+    def observe(self, venue_code, movies):
+        gross = sum(show.paise for shows in movies.values() for show in shows) / 100
+        shows = sum(len(shows) for shows in movies.values())
+        with self.lock:
+            old = self.venues.get(venue_code)
+            if old is not None:
+                gross = old[0] + STATS_WEIGHT * (gross - old[0])
+                shows = old[1] + STATS_WEIGHT * (shows - old[1])
+            self.venues[venue_code] = self.updated[venue_code] = [round(gross, 2), round(shows, 2)]
+
+    def save(self):
+        if self.path is None or not self.updated:
+            return
+        with self.lock:
+            updated, self.updated = self.updated, {}
+        # re-read first: shards sharing the file only ever touch their own venues
+        with locked(self.path):
+            venues = load_json(self.path, {})
+            venues.update(updated)
+            os.replace(write_json_tmp(self.path, dumps(venues)), self.path)
+
+
+def format_weight(formats):
+    # more formats, and premium ones especially, mean a bigger venue
+    names = [name.strip().upper() for name in formats.split("|") if name.strip() != "Unknown"]
+    premium = sum(any(p in name for p in PREMIUM_FORMATS) for name in names)
+    return 1.0 + 0.25 * len(names) + 0.5 * premium
+
+
+def schedule_venues(registry, codes, stats):
+    # highest expected gross first. Venues with history go by it; the rest by
+    # a city tier x format prior, scaled into rupees by the venues that have
+    # both. Ties keep venues.json order.
+    city_sizes = Counter(registry.columns["City"])
+
+    def prior(code):
+        size = city_sizes[registry.field(code, "City")]
+        tier = next(weight for minimum, weight in CITY_TIERS if size >= minimum)
+        return tier * format_weight(registry.field(code, "AvailableFormats"))
+
+    priors = {code: prior(code) for code in codes}
+    known = [code for code in codes if code in stats.venues]
+    scale = sum(stats.venues[code][0] for code in known) / sum(priors[code] for code in known) if known else 0.0
+    scale = scale or 1.0
+
+    def expected(code):
+        history = stats.venues.get(code)
+        if history is not None:
+            return -history[0], -history[1]
+        return -priors[code] * scale, 0.0
+
+    print(f"📈 Fetching by expected gross ({len(known)} of {len(codes)} venues have history)")
+    return sorted(codes, key=expected)
 
-    df_movie_only = pd.DataFrame(movie_only_rows)
-    df_movie_only = df_movie_only.sort_values(by="Gross", ascending=False).reset_index(
-        drop=True
+
+# ---------------- MAIN ----------------
+def parse_dates(spec):
+    # "20250905", "20250905,20250907" or an inclusive range "20250905-20250907"
+    dates = []
+    for part in spec.split(","):
+        start, _, end = part.strip().partition("-")
+        day = datetime.strptime(start, "%Y%m%d")
+        last = datetime.strptime(end, "%Y%m%d") if end else day
+        while day <= last:
+            dates.append(int(day.strftime("%Y%m%d")))
+            day += timedelta(days=1)
+    return sorted(set(dates))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="BookMyShow venue sweep")
+    parser.add_argument(
+        "--engine",
+        choices=["threads", "async"],
+        default="threads",
+        help="threads: cloudscraper thread pool; async: aiohttp with adaptive concurrency",
+    )
+    parser.add_argument(
+        "--dates",
+        type=parse_dates,
+        default=[DATE_CODE],
+        help="date codes to sweep, e.g. 20250905 or 20250905-20250907",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="keep re-polling venues until their shows start, updating aggregates in place",
+    )
+    parser.add_argument("--state", action="append", help="only venues in this State (repeatable)")
+    parser.add_argument("--city", action="append", help="only venues in this City (repeatable)")
+    parser.add_argument("--region", action="append", help="only venues with this RegionCode (repeatable)")
+    parser.add_argument(
+        "--bbox",
+        type=parse_bbox,
+        help="only venues inside south,west,north,east (degrees)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="i/N: only venues whose code hashes to shard i (0-based) of N; "
+        "state goes to <state-dir>/shard-iofN/",
+    )
+    parser.add_argument(
+        "--state-dir",
+        default=STATE_DIR,
+        help="root for per-date checkpoints (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="SHARD_ROOT",
+        help="merge these shard state roots into --state-dir for --dates and exit",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["gross", "file"],
+        default="gross",
+        help=f"gross: highest expected gross first, from <state-dir>/{VENUE_STATS}, city size "
+        "and formats; file: venues.json order (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=PARSE_WORKERS,
+        help="parse bodies in this many worker processes instead of the fetch "
+        "threads (ignored with --poll)",
     )
-    print(df_movie_only.to_string(index=False))
-    pretty_divider("Format & Language-wise Summary")
+    parser.add_argument(
+        "--stream-parse",
+        type=int,
+        metavar="KIB",
+        help="walk bodies of at least KIB incrementally (needs ijson): lower peak "
+        "memory for ~3x the parse CPU (default: off)",
+    )
+    parser.add_argument(
+        "--db",
+        action="store_true",
+        help=f"also keep show rows and their history in <state-dir>/{SHOW_DB} (SQLite); "
+        "movie_summary.json/.csv are then generated from it",
+    )
+    parser.add_argument("--record", metavar="DIR", help="save every raw response under DIR/<date>/<venue>.json")
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="answer from a --record directory instead of the live API (no network)",
+    )
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=SESSION_POOL_SIZE,
+        help=f"cloudscraper sessions to pool; cookies persist in <state root>/{SESSION_STATE} (default: %(default)s)",
+    )
+    parser.add_argument("--api-base", default=API_BASE, help="showtimes API origin (default: %(default)s)")
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=RATE_LIMIT_RPS,
+        help="request rate across all workers, 0 for no limit (default: %(default)s)",
+    )
+    parser.add_argument("--burst", type=int, default=RATE_LIMIT_BURST, help="requests allowed back to back (default: %(default)s)")
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=REQUEST_BUDGET,
+        help="stop making requests after this many; the rest resume next run (default: no cap)",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=["snappy", "zstd", "gzip", "none"],
+        default=SHOWS_COMPRESSION,
+        help="codec for the Parquet show parts (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=METRICS_PORT,
+        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics",
+    )
+    parser.add_argument(
+        "--api-port",
+        type=int,
+        default=API_PORT,
+        help="serve the live rollups as JSON on PORT (/movies, /cities, /chains, /languages, /dates)",
+    )
+    parser.add_argument("--api-host", default=API_HOST, help="address for --api-port (default: %(default)s)")
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help=f"no per-venue lines, only a progress line every {PROGRESS_INTERVAL}s",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"do not keep raw responses in <state-dir>/{CACHE_DIR}/",
+    )
+    parser.add_argument(
+        "--export",
+        choices=["csv", "parquet"],
+        help="also write the console reports to state/<date>/reports/",
+    )
+    return parser.parse_args()
+
 
-    print("✅ Movie summary saved to movie_summary.csv")
-    dump_progress(all_data, fetched_venues)
-    print("✅ Final progress saved.")
+if __name__ == "__main__":
+    args = parse_args()
+    if args.merge:
+        merge_outputs(args.merge, args.dates, args.state_dir)
+        sys.exit(0)
+
+    set_verbose(not args.quiet)
+    if args.stream_parse is not None:
+        set_stream_parse(args.stream_parse * 1024)
+    SHOWS_COMPRESSION = args.compress
+    # replayed fixtures never reach the API, so only the budget applies
+    limiter = TokenBucket(0 if args.replay else args.rps, args.burst, args.budget)
+    API_BASE = args.api_base
+    record_dir = args.record
+    state_root = args.state_dir
+    if args.shard:
+        state_root = os.path.join(state_root, "shard-{}of{}".format(*args.shard))
+    if args.replay:
+        if args.engine == "async":
+            API_BASE = "http://127.0.0.1:{}".format(serve_fixtures(args.replay).server_port)
+        transport = ReplayTransport(args.replay)
+        print(f"📼 Replaying responses from {args.replay}")
+    elif args.engine == "threads" or args.poll:
+        # per shard: each pool saves every live session it holds
+        transport = SessionPool(max(1, args.sessions), os.path.join(state_root, SESSION_STATE))
+        transport.fill()
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    venues = VenueRegistry.load(snapshot=os.path.join(args.state_dir, REGISTRY_SNAPSHOT))
+    selected = select_venues(venues, args)
+    if args.shard:
+        print(f"🧩 Shard {args.shard[0]}/{args.shard[1]}: {len(selected)} of {len(venues)} venues -> {state_root}")
+    elif len(selected) < len(venues):
+        print(f"🎯 Selected {len(selected)} of {len(venues)} venues")
+    venue_stats = VenueStats(os.path.join(args.state_dir, VENUE_STATS))
+    if args.order == "gross":
+        selected = schedule_venues(venues, selected, venue_stats)
+
+    if not args.no_cache:
+        # shards keep their own cache so parallel processes never share an index
+        cache = ResponseCache(os.path.join(state_root, CACHE_DIR))
+    db = ShowDB(os.path.join(state_root, SHOW_DB)) if args.db else None
+    for date_code in args.dates:
+        checkpoints[date_code] = CheckpointWriter(venues, date_code, state_root, db=db)
+
+    if args.api_port:
+        serve_api(checkpoints, args.api_port, args.api_host)
+
+    # date-major order: the sweeps queue each venue's dates in this order,
+    # the next only once the one before has answered (date_chains)
+    work = [(vcode, date_code) for date_code in args.dates for vcode in selected]
+    # --poll starts every date over: run_poll() resets the writers
+    already = 0 if args.poll else sum(len(w.fetched_venues) for w in checkpoints.values())
+    progress = ProgressLine(len(work) - already)
+
+    if args.poll:
+        print(f"🔁 Polling {len(work)} venue/date pairs with {NUM_WORKERS} workers")
+        run_poll(work)
+    elif args.engine == "async":
+        if args.parse_workers:
+            pipeline = ParsePipeline(venues, args.parse_workers)
+        print(f"🚀 Starting async fetch for {len(args.dates)} date(s). Already fetched: {already} venues")
+        asyncio.run(run_async_sweep(work))
+    else:
+        print(
+            f"🚀 Starting fetch with {NUM_WORKERS} workers for {len(args.dates)} date(s). Already fetched: {already} venues"
+        )
+        if args.parse_workers:
+            pipeline = ParsePipeline(venues, args.parse_workers)
+        run_thread_sweep(work)
+    if pipeline is not None:
+        pipeline.close()
+    progress.close()
+
+    for date_code, writer in checkpoints.items():
+        writer.close()
+        if writer.dead_letter:
+            print(
+                f"☠️ {len(writer.dead_letter)} venues failed every retry, see {writer.path('dead_letter.json')}"
+            )
+    if cache is not None:
+        cache.save()
+    if isinstance(transport, SessionPool):
+        transport.save()
+    venue_stats.save()
+    if venues.dirty:
+        venues.save()
+    run_report = os.path.join(state_root, RUN_REPORT)
+    os.replace(write_json_tmp(run_report, dumps(metrics.report(), pretty=True)), run_report)
+    print(progress.line())
+    print(f"✅ Final progress saved. Run report: {run_report}")
+
+    import report
+
+    for date_code, writer in checkpoints.items():
+        report.pretty_divider(f"{date_code}")
+        frame = report.summary_frame(writer.movie_summary)
+        report.save_summary_csv(frame, writer.path("movie_summary.csv"))
+
+        # group-bys over the stored show rows when they account for every
+        # show in the summary; its own rollups otherwise (no pyarrow, or
+        # parts missing for venues processed before they were kept)
+        shows = load_shows(date_code, writer.show_table, writer.shows_dir, writer.processed_venues)
+        if len(shows) and len(shows) == frame["shows"].sum():
+            frame = report.shows_frame(shows)
+        elif len(shows):
+            print(f"⚠️ Show rows cover {len(shows)} of {frame['shows'].sum()} shows; reporting from the summary")
+        reports = report.build_reports(frame)
+        report.print_reports(reports)
+        if args.export:
+            for path in report.export_reports(reports, args.export, writer.path("reports")):
+                print(f"✅ Report saved to {path}")
+
+        print(f"✅ Movie summary saved to {writer.path('movie_summary.csv')}")
+    if db is not None:
+        db.close()
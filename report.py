@@ -0,0 +1,145 @@
+import os
+
+import pandas as pd
+
+# Matches "Title [Dimension | Language]", "Title [Dimension]" and "Title"
+TITLE_PATTERN = (
+    r"^(?P<title>.*?)\s*"
+    r"(?:\[\s*(?P<dimension>[^|\]]*?)\s*(?:\|\s*(?P<language>[^\]]*?)\s*)?\])?\s*$"
+)
+
+REPORTS = {
+    "language": ["title", "language"],
+    "movie": ["title"],
+    "format_language": ["dimension", "language"],
+}
+
+
+def format_rgross(value):
+    if value >= 1e7:
+        return f"{round(value/1e7, 2)} Cr"
+    elif value >= 1e5:
+        return f"{round(value/1e5, 2)} L"
+    elif value >= 1e3:
+        return f"{round(value/1e3, 2)} K"
+    else:
+        return str(round(value, 2))
+
+
+# ---------------- LOADING ----------------
+def summary_frame(movie_summary):
+    frame = pd.DataFrame.from_dict(movie_summary, orient="index")
+    frame.index.name = "movie"
+    frame = frame.reset_index()
+    if frame.empty:
+        return pd.DataFrame(
+            columns=["movie", "title", "dimension", "language",
+                     "shows", "gross", "sold", "totalSeats"]
+        )
+
+    # summaries written before the structured fields existed only have the
+    # display title to go on
+    parsed = frame["movie"].str.extract(TITLE_PATTERN)
+    for col in ("title", "dimension", "language"):
+        if col not in frame:
+            frame[col] = parsed[col]
+        else:
+            frame[col] = frame[col].where(frame[col].notna(), parsed[col])
+
+    frame["title"] = frame["title"].fillna(frame["movie"]).str.strip()
+    frame["dimension"] = frame["dimension"].fillna("")
+    frame["language"] = frame["language"].fillna("").replace("", "Unknown")
+    return frame
+
+
+def shows_frame(shows):
+    # one row per show, as main.load_shows returns them, in the columns
+    # summary_frame gives rollup()
+    if shows.empty:
+        return summary_frame({})
+    return pd.DataFrame(
+        {
+            "title": shows["title"].astype(str).str.strip(),
+            "dimension": shows["dimension"].astype(str),
+            "language": shows["language"].astype(str).replace("", "Unknown"),
+            "shows": 1,
+            "gross": shows["gross"],
+            "sold": shows["sold"],
+            "totalSeats": shows["total"],
+        }
+    )
+
+
+# ---------------- TABLES ----------------
+def rollup(frame, keys):
+    out = (
+        frame.groupby(keys, sort=False)
+        .agg(
+            Shows=("shows", "sum"),
+            Gross=("gross", "sum"),
+            Sold=("sold", "sum"),
+            TotalSeats=("totalSeats", "sum"),
+        )
+        .reset_index()
+    )
+    out["ATP"] = (out["Gross"] / out["Sold"]).where(out["Sold"] > 0, 0).round(2)
+    out["Occ%"] = (out["Sold"] / out["TotalSeats"] * 100).where(
+        out["TotalSeats"] > 0, 0
+    ).round(2)
+    out["RGross"] = out["Gross"].map(format_rgross)
+    out["Gross"] = out["Gross"].round(2)
+    return out.sort_values(by="Gross", ascending=False).reset_index(drop=True)
+
+
+def build_reports(frame):
+    return {name: rollup(frame, keys) for name, keys in REPORTS.items()}
+
+
+def console_view(name, table):
+    if name == "language":
+        label = table["title"] + " (" + table["language"] + ")"
+        return table.drop(columns=["title", "language"]).assign(**{"Movie (Lang)": label})[
+            ["Movie (Lang)", "Shows", "Gross", "Sold", "TotalSeats", "ATP", "Occ%", "RGross"]
+        ]
+    if name == "movie":
+        return table.rename(columns={"title": "Movie"})
+    return table.rename(columns={"dimension": "Format", "language": "Language"})
+
+
+# ---------------- OUTPUT ----------------
+def pretty_divider(title=""):
+    line = "─" * 25
+    if title:
+        print(f"\n{line} ✦ {title} ✦ {line}\n")
+    else:
+        print(f"\n{line} ✦ {line}\n")
+
+
+def print_reports(reports):
+    titles = {
+        "language": "Language-wise Summary",
+        "movie": "Movie-wise Summary",
+        "format_language": "Format & Language-wise Summary",
+    }
+    for name, table in reports.items():
+        pretty_divider(titles[name])
+        print(console_view(name, table).to_string(index=False))
+
+
+def save_summary_csv(frame, path):
+    out = frame.rename(columns={"movie": "Movie"})
+    out = out.sort_values(by="gross", ascending=False).reset_index(drop=True)
+    out.to_csv(path, index=False)
+
+
+def export_reports(reports, fmt, out_dir="reports"):
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, table in reports.items():
+        path = os.path.join(out_dir, f"{name}_summary.{fmt}")
+        if fmt == "parquet":
+            table.to_parquet(path, index=False)
+        else:
+            table.to_csv(path, index=False)
+        paths.append(path)
+    return paths
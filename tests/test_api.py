@@ -0,0 +1,117 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+import main
+from main import CheckpointWriter, MovieSummary, Show, ShowEvent, ShowVenue, SummaryViews, VenueRegistry
+
+DATE = 20250905
+VENUES = {
+    "V1": ("Pune", "Maharashtra", "PVR"),
+    "V2": ("Pune", "Maharashtra", "INOX"),
+    "V3": ("Chennai", "Tamil Nadu", "PVR"),
+}
+EVENTS = {
+    "A": ShowEvent("A [2D | Hindi]", "A", "EGA", "ETA", "2D", "Hindi"),
+    "B": ShowEvent("B [2D | Tamil]", "B", "EGB", "ETB", "2D", "Tamil"),
+}
+
+
+def venue_movies(venue_code, sold_by_event):
+    place = ShowVenue(venue_code, venue_code, "", VENUES[venue_code][2])
+    return {
+        EVENTS[e].movie: [Show(place, EVENTS[e], "10:00 AM", f"{venue_code}{e}", "", 100, sold, 100 - sold, sold * 20000)]
+        for e, sold in sold_by_event.items()
+    }
+
+
+DATA = {
+    "V1": venue_movies("V1", {"A": 90, "B": 10}),
+    "V2": venue_movies("V2", {"A": 40}),
+    "V3": venue_movies("V3", {"A": 20, "B": 70}),
+}
+
+
+@pytest.fixture
+def views():
+    summary = MovieSummary()
+    for venue_code, movies in DATA.items():
+        summary.add_venue(*VENUES[venue_code][:2], movies)
+    return SummaryViews(DATE, 1, summary)
+
+
+def test_movies_sorted_both_ways(views):
+    page = views.page("movies", "sold")
+    assert page["total"] == 2
+    assert [(r["movie"], r["sold"], r["gross"], r["venues"]) for r in page["items"]] == [
+        ("A [2D | Hindi]", 150, 30000.0, 3),
+        ("B [2D | Tamil]", 80, 16000.0, 2),
+    ]
+    assert page["items"][0]["title"] == "A" and page["items"][0]["atp"] == 200.0
+    assert [r["movie"] for r in views.page("movies", "sold", "asc")["items"]] == ["B [2D | Tamil]", "A [2D | Hindi]"]
+
+
+def test_rollups_across_movies(views):
+    cities = views.page("cities", "sold")["items"]
+    assert [(r["city"], r["sold"], r["occupancy"]) for r in cities] == [("Pune", 140, 46.67), ("Chennai", 90, 45.0)]
+    assert "venues" not in cities[0]
+    languages = views.page("languages", "gross")["items"]
+    assert [(r["language"], r["gross"]) for r in languages] == [("Hindi", 30000.0), ("Tamil", 16000.0)]
+    chains = views.page("chains", "shows")["items"]
+    assert {r["chain"]: r["shows"] for r in chains} == {"PVR": 4, "INOX": 1}
+
+
+def test_offsets_and_movie_filter(views):
+    page = views.page("cities", "sold", "desc", offset=1, limit=1)
+    assert [r["city"] for r in page["items"]] == ["Chennai"]
+    page = views.page("cities", "sold", "asc", offset=1, limit=5)
+    assert [r["city"] for r in page["items"]] == ["Pune"]
+    assert views.page("cities", "sold", "asc", offset=5)["items"] == []
+
+    rows = views.page("chains", "sold", movie="B [2D | Tamil]")["items"]
+    assert [(r["chain"], r["sold"], r["venues"]) for r in rows] == [("PVR", 80, 2)]
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ARROW", False)
+    registry = VenueRegistry.from_venues({code: {"City": c, "State": s} for code, (c, s, _) in VENUES.items()})
+    writer = CheckpointWriter(registry, DATE, tmp_path)
+    for venue_code, movies in DATA.items():
+        writer.add_venue(venue_code, movies)
+    server = main.serve_api({DATE: writer}, 0)
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    writer.close()
+
+
+def get(url, **headers):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as res:
+            return res.status, res.headers, res.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, b""
+
+
+def test_http_pages_and_etags(server):
+    status, headers, body = get(f"{server}/movies?sort=sold&limit=1")
+    assert status == 200
+    page = json.loads(body)
+    assert page["total"] == 2 and [r["movie"] for r in page["items"]] == ["A [2D | Hindi]"]
+
+    status, _, body = get(f"{server}/movies?sort=sold&limit=1", **{"If-None-Match": headers["ETag"]})
+    assert (status, body) == (304, b"")
+
+    status, _, body = get(f"{server}/dates")
+    assert json.loads(body)["dates"][0]["venues"] == 3
+
+
+@pytest.mark.parametrize("path", ["/movies?sort=venue", "/movies?order=up", "/movies?date=1", "/movies?limit=x"])
+def test_http_bad_queries(server, path):
+    assert get(server + path)[0] == 400
+
+
+def test_http_unknown_endpoint(server):
+    assert get(f"{server}/venues")[0] == 404
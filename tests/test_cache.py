@@ -0,0 +1,73 @@
+import pytest
+
+import main
+from main import UNCHANGED, CheckpointWriter, ResponseCache, VenueRegistry, cache_key, resolve_body
+
+DATE = 20250905
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(main, "cache", cache)
+    return cache
+
+
+def test_304_serves_the_cached_body(cache):
+    key = cache_key("V1", DATE)
+    assert resolve_body(key, DATE, 200, b'{"a": 1}', {"ETag": '"v1"'}, False) == b'{"a": 1}'
+    assert cache.validators(key) == {"If-None-Match": '"v1"'}
+    assert resolve_body(key, DATE, 304, b"", {}, False) == b'{"a": 1}'
+    assert resolve_body(key, DATE, 304, b"", {}, True) is UNCHANGED
+    with pytest.raises(ValueError):
+        resolve_body(cache_key("V2", DATE), DATE, 304, b"", {}, False)
+
+
+def test_identical_body_short_circuits(cache):
+    key = cache_key("V1", DATE)
+    assert cache.store(key, DATE, b"one") is True
+    assert cache.store(key, DATE, b"one") is False
+    assert resolve_body(key, DATE, 200, b"one", {}, True) is UNCHANGED
+    assert resolve_body(key, DATE, 200, b"two", {}, True) == b"two"
+    assert cache.read(key) == b"two"
+
+
+def test_lru_eviction_past_max_bytes(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=25)
+    for venue in ("V1", "V2"):
+        cache.store(cache_key(venue, DATE), DATE, b"x" * 10)
+    cache.read(cache_key("V1", DATE))  # V2 is now the least recently used
+    cache.store(cache_key("V3", DATE), DATE, b"y" * 10)
+
+    assert cache.read(cache_key("V2", DATE)) is None
+    assert cache.read(cache_key("V1", DATE)) == b"x" * 10
+    assert cache.total_bytes == 20
+    assert not (tmp_path / str(DATE) / "V2.json").exists()
+
+
+def test_past_dates_expire_after_their_ttl(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), past_ttl=60)
+    past, key = 20200101, cache_key("V1", 20200101)
+    cache.store(key, past, b"old")
+    assert cache.final(key)
+    assert not cache.final(cache_key("V1", DATE)) and not cache.final(cache_key("V2", past))
+    cache.save()
+
+    later = main.time.time() + 61
+    monkeypatch.setattr(main.time, "time", lambda: later)
+    assert not cache.final(key)
+    reopened = ResponseCache(str(tmp_path), past_ttl=60)
+    assert reopened.read(key) is None
+    assert not (tmp_path / str(past) / "V1.json").exists()
+
+
+def test_index_is_saved_with_each_checkpoint(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ARROW", False)
+    registry = VenueRegistry.from_venues({"V1": {}})
+    writer = CheckpointWriter(registry, DATE, tmp_path / "state")
+    cache.store(cache_key("V1", DATE), DATE, b"body")
+    writer.add_venue("V1", {})
+    writer.flush()
+
+    assert ResponseCache(cache.root).read(cache_key("V1", DATE)) == b"body"
+    writer.close()
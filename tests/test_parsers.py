@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+import main
+from bench import multiplex_payload
+from main import body_date, iter_shows, parse_body, parse_showtimes, payload_date
+
+DATE = 20250905
+
+
+def payload(date=DATE, venues=True, children=None):
+    children = children if children is not None else [
+        {
+            "EventCode": "ET1",
+            "EventDimension": " 2D ",
+            "EventLanguage": "Hindi",
+            "ShowTimes": [
+                {
+                    "ShowTime": "10:00 AM",
+                    "SessionId": "101",
+                    "Attributes": "AUDI 1",
+                    "Categories": [
+                        {"MaxSeats": "100", "SeatsAvail": "40", "CurPrice": "150.50"},
+                        {"MaxSeats": "20", "SeatsAvail": "0", "CurPrice": "400.00"},
+                    ],
+                },
+                {"ShowTime": "01:00 PM", "SessionId": "102", "Attributes": "AUDI 1", "Categories": []},
+            ],
+        },
+        {"EventCode": "ET2", "EventDimension": "", "EventLanguage": "", "ShowTimes": [{"SessionId": "201"}]},
+    ]
+    details = {
+        "Date": str(date),
+        "Event": [{"EventTitle": "Movie", "EventGroup": "EG1", "ChildEvents": children}],
+    }
+    if venues:
+        details["Venues"] = {"VenueName": "Venue", "VenueAdd": "Street", "VenueCompName": "PVR"}
+    return {"ShowDetails": [details]}
+
+
+def records(movies):
+    # comparable view of parse output: every field a show exposes
+    fields = main.ShowVenue.__slots__ + main.ShowEvent.__slots__ + main.Show.__slots__[2:]
+    return {movie: [tuple(getattr(show, f) for f in fields) for show in shows] for movie, shows in movies.items()}
+
+
+def test_parse_showtimes_fields():
+    movies = parse_showtimes("V1", payload(), DATE)
+    assert list(movies) == ["Movie [2D | Hindi]", "Movie"]
+
+    first, empty = movies["Movie [2D | Hindi]"]
+    assert (first.venue_code, first.venue, first.address, first.chain) == ("V1", "Venue", "Street", "PVR")
+    assert (first.title, first.dimension, first.language) == ("Movie", "2D", "Hindi")
+    assert (first.parent_event_code, first.child_event_code) == ("EG1", "ET1")
+    assert (first.time, first.session_id, first.audi) == ("10:00 AM", "101", "AUDI 1")
+    assert (first.total, first.sold, first.available) == (120, 80, 40)
+    assert first.paise == 60 * 15050 + 20 * 40000
+    assert first.gross == 17030.0
+    assert first.occupancy == 66.67
+    assert (empty.total, empty.sold, empty.paise, empty.occupancy) == (0, 0, 0, 0)
+
+    (plain,) = movies["Movie"]
+    assert (plain.dimension, plain.language, plain.time, plain.audi) == ("", "", "", "")
+
+
+def test_parse_showtimes_skips_other_dates_and_missing_venues():
+    assert parse_showtimes("V1", payload(date=DATE + 1), DATE) == {}
+    assert parse_showtimes("V1", payload(venues=False), DATE) == {}
+    assert parse_showtimes("V1", {"ShowDetails": []}, DATE) == {}
+    assert parse_showtimes("V1", {}, DATE) == {}
+
+
+def test_payload_and_body_date():
+    assert payload_date(payload()) == DATE
+    assert payload_date({"ShowDetails": [{"Date": "soon"}]}) is None
+    assert payload_date({}) is None
+    assert body_date(json.dumps(payload()).encode()) == DATE
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_streaming_matches_tree(seed):
+    pytest.importorskip("ijson")
+    body = multiplex_payload(f"V{seed}", DATE, seed=seed)
+    tree = parse_showtimes(f"V{seed}", json.loads(body), DATE)
+    streamed = {}
+    for show in iter_shows(f"V{seed}", body, DATE):
+        streamed.setdefault(show.movie, []).append(show)
+    assert records(streamed) == records(tree)
+
+
+def test_streaming_skips_other_dates():
+    pytest.importorskip("ijson")
+    body = multiplex_payload("V1", DATE + 1)
+    assert list(iter_shows("V1", body, DATE)) == []
+
+
+def test_parse_body_streams_large_bodies(monkeypatch):
+    pytest.importorskip("ijson")
+    body = multiplex_payload("V1", DATE)
+    expected = records(parse_showtimes("V1", json.loads(body), DATE))
+    monkeypatch.setattr(main, "STREAM_PARSE_BYTES", 0)
+    assert records(parse_body("V1", body, DATE)) == expected
+    monkeypatch.setattr(main, "STREAM_PARSE_BYTES", len(body) + 1)
+    assert records(parse_body("V1", body, DATE)) == expected
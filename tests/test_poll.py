@@ -0,0 +1,117 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+from bench import synthetic_dataset
+from main import CheckpointWriter, MovieSummary, Show, VenueRegistry, next_poll_in
+
+DATE = 20250905
+
+
+@pytest.fixture
+def dataset():
+    return synthetic_dataset(num_venues=30, num_movies=30, num_cities=5, seed=11)
+
+
+@pytest.fixture
+def writer(tmp_path, dataset, monkeypatch):
+    monkeypatch.setattr(main, "ARROW", False)
+    writer = CheckpointWriter(VenueRegistry.from_venues(dataset[1]), DATE, tmp_path)
+    yield writer
+    writer.close()
+
+
+def canonical(summary):
+    out = summary.to_json()
+    for data in out.values():
+        data["details"] = sorted(data["details"], key=lambda d: (d["state"], d["city"]))
+        data["Chain_details"] = sorted(data["Chain_details"], key=lambda d: d["chain"])
+    return out
+
+
+def resold(movies, sold_delta):
+    return {
+        movie: [
+            Show(s.place, s.event, s.time, s.session_id, s.audi, s.total,
+                 min(s.total, s.sold + sold_delta), max(0, s.available - sold_delta),
+                 s.paise + sold_delta * 10000)
+            for s in shows
+        ]
+        for movie, shows in movies.items()
+    }
+
+
+def polls(movies):
+    # what successive polls of one venue see: sales move, then a movie drops
+    # out, then one comes back with more sales
+    second = resold(movies, 2)
+    third = dict(second)
+    dropped = third.pop(next(iter(third)))
+    return [movies, second, third, {**resold(third, 1), dropped[0].movie: dropped}]
+
+
+def summary_of(dataset, venues):
+    all_data, venues_info = dataset
+    summary = MovieSummary()
+    for code, movies in venues.items():
+        summary.add_venue(venues_info[code]["City"], venues_info[code]["State"], movies)
+    return summary
+
+
+def test_polls_from_many_threads_match_the_latest_snapshots(writer, dataset):
+    all_data, _ = dataset
+    rounds = {code: polls(movies) for code, movies in all_data.items()}
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for i in range(4):
+            # each round lands on whichever threads pick it up
+            list(pool.map(lambda code: writer.replace_venue(code, rounds[code][i]), rounds))
+
+    latest = {code: snaps[-1] for code, snaps in rounds.items()}
+    assert canonical(writer.snapshot()[1]) == canonical(summary_of(dataset, latest))
+    assert writer.processed_venues == set(all_data)
+
+
+def test_replace_returns_the_previous_snapshot(writer, dataset):
+    movies = dataset[0]["V00000"]
+    assert writer.replace_venue("V00000", movies) is None
+    assert writer.replace_venue("V00000", {}) is movies
+    assert canonical(writer.snapshot()[1]) == canonical(MovieSummary())
+
+
+def test_reset_starts_from_an_empty_summary(writer, dataset):
+    all_data, _ = dataset
+    for code, movies in all_data.items():
+        writer.add_venue(code, movies)
+    writer.reset()
+    assert not writer.fetched_venues and not writer.processed_venues and not writer.snapshots
+    assert canonical(writer.snapshot()[1]) == canonical(MovieSummary())
+
+    writer.replace_venue("V00001", all_data["V00001"])
+    assert canonical(writer.snapshot()[1]) == canonical(summary_of(dataset, {"V00001": all_data["V00001"]}))
+
+
+def date_in(days):
+    return int((datetime.now(main.IST) + timedelta(days=days)).strftime("%Y%m%d"))
+
+
+def with_time(movies, show_time):
+    return {
+        movie: [Show(s.place, s.event, show_time, s.session_id, s.audi, s.total, s.sold, s.available, s.paise) for s in shows]
+        for movie, shows in movies.items()
+    }
+
+
+def test_next_poll_in(dataset):
+    movies = with_time(dataset[0]["V00002"], "10:00 PM")
+    # every show has started
+    assert next_poll_in(date_in(-1), None, movies, None) is None
+    # far off and quiet: the slowest cadence
+    later = date_in(3)
+    assert next_poll_in(later, None, movies, None) == main.POLL_MAX_INTERVAL
+    assert next_poll_in(later, movies, movies, 600) == main.POLL_MAX_INTERVAL
+    # selling: at least twice as often
+    assert next_poll_in(later, movies, resold(movies, 1), 600) <= main.POLL_MAX_INTERVAL / 2
+    # selling out fast: as often as allowed
+    assert next_poll_in(later, movies, resold(movies, 50), 1) == main.POLL_MIN_INTERVAL
@@ -0,0 +1,62 @@
+import pytest
+
+import main
+from main import TokenBucket, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("-5") == 0.0
+    assert parse_retry_after("100000") == main.RETRY_AFTER_MAX
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0  # in the past
+
+
+def test_burst_then_rate():
+    bucket = TokenBucket(rate=10, burst=2, budget=0)
+    assert bucket._reserve() == 0
+    assert bucket._reserve() == 0
+    assert bucket._reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket._reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_zero_rate_never_waits():
+    bucket = TokenBucket(rate=0, burst=1, budget=0)
+    assert all(bucket._reserve() == 0 for _ in range(100))
+
+
+def test_budget_caps_requests():
+    bucket = TokenBucket(rate=0, burst=1, budget=3)
+    assert [bucket.acquire() for _ in range(5)] == [True, True, True, False, False]
+    assert bucket.spent == 3 and bucket.exhausted
+
+
+def test_throttling_halves_once_per_window_and_recovers():
+    bucket = TokenBucket(rate=8, burst=16, budget=0)
+    bucket.observe(429)
+    bucket.observe(503)  # same window: no second cut
+    assert bucket.rate == 4
+    assert bucket.tokens <= 0  # no burst straight after throttling
+
+    for _ in range(10):
+        bucket.observe(200)
+    assert bucket.rate == pytest.approx(4 + 10 * main.RATE_RECOVERY_STEP)
+    for _ in range(1000):
+        bucket.observe(200)
+    assert bucket.rate == 8
+
+
+def test_rate_never_drops_below_the_floor(monkeypatch):
+    monkeypatch.setattr(main, "RATE_DECREASE_INTERVAL", 0)
+    bucket = TokenBucket(rate=1, burst=1, budget=0)
+    for _ in range(10):
+        bucket.observe(429)
+    assert bucket.rate == main.RATE_LIMIT_FLOOR
+
+
+def test_retry_after_pauses_every_request():
+    bucket = TokenBucket(rate=0, burst=1, budget=0)
+    bucket.observe(429, "30")
+    assert 29 < bucket._reserve() <= 30
@@ -0,0 +1,14 @@
+from main import VenueRegistry
+
+
+def test_bad_coordinates_keep_rows_aligned():
+    registry = VenueRegistry.from_venues({
+        "V1": {"Latitude": "18.52", "Longitude": "73.85"},
+        "V2": {"Latitude": "18.50", "Longitude": "n/a"},  # lat parses, lon doesn't
+        "V3": {"Latitude": "nan", "Longitude": "73.80"},
+        "V4": {"Latitude": "18.55", "Longitude": "nan"},
+        "V5": {"Latitude": "18.60", "Longitude": "73.90"},
+    })
+    assert len(registry.lat) == len(registry.lon) == 5
+    assert (registry.lat[4], registry.lon[4]) == (18.60, 73.90)
+    assert registry.in_bbox(18.0, 73.0, 19.0, 74.0) == ["V1", "V5"]
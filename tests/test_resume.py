@@ -0,0 +1,96 @@
+import os
+from array import array
+
+import pytest
+
+import main
+from main import CheckpointWriter, ResumeIndex, Show, ShowEvent, ShowVenue, VenueRegistry
+
+DATE = 20250905
+
+
+@pytest.fixture
+def registry():
+    return VenueRegistry.from_venues({f"V{i:03d}": {"City": "Pune", "State": "Maharashtra"} for i in range(20)})
+
+
+def test_round_trip(tmp_path, registry):
+    index = ResumeIndex(tmp_path, registry)
+    assert index.load() is None
+    index.write({"V000", "V007", "V019"}, {"V000", "V019"})
+    assert ResumeIndex(tmp_path, registry).load() == ({"V000", "V007", "V019"}, {"V000", "V019"})
+
+
+def test_log_replays_over_the_bitsets(tmp_path, registry):
+    index = ResumeIndex(tmp_path, registry)
+    index.write({"V001"}, set())
+    index.append(array("I", [index.entry("V001", True), index.entry("V009", False)]))
+    index.append(array("I", [index.entry("V012", True)]))
+    with open(index.log_path, "ab") as f:
+        f.write(b"\x01\x02")  # torn write from a crash mid-append
+
+    reloaded = ResumeIndex(tmp_path, registry)
+    assert reloaded.load() == ({"V001", "V009", "V012"}, {"V001", "V012"})
+    assert reloaded.log_entries == 3
+
+    index.write(*reloaded.load())
+    assert os.path.getsize(index.log_path) == 0
+    assert ResumeIndex(tmp_path, registry).load() == ({"V001", "V009", "V012"}, {"V001", "V012"})
+
+
+def test_stale_when_the_registry_changes(tmp_path, registry):
+    ResumeIndex(tmp_path, registry).write({"V001"}, {"V001"})
+    other = VenueRegistry.from_venues({"V999": {"City": "Pune", "State": "Maharashtra"}, **{c: {} for c in registry}})
+    assert ResumeIndex(tmp_path, other).load() is None
+
+
+def test_stale_when_the_json_is_newer(tmp_path, registry):
+    index = ResumeIndex(tmp_path, registry)
+    index.write({"V001"}, {"V001"})
+    json_path = tmp_path / "fetchedvenues.json"
+    json_path.write_text("[]")
+    later = os.path.getmtime(index.log_path) + 5
+    os.utime(json_path, (later, later))
+    assert index.load(newer_than=[json_path]) is None
+
+
+def test_writer_resumes_from_the_index(tmp_path, registry, monkeypatch):
+    monkeypatch.setattr(main, "ARROW", False)
+    writer = CheckpointWriter(registry, DATE, tmp_path)
+    assert writer.index_stale  # first run: nothing to resume from
+    writer.add_venue("V001", {})
+    writer.add_venue("V002", {})
+    writer.flush()
+    writer.close()  # a final flush with nothing new still rewrites the JSON
+
+    resumed = CheckpointWriter(registry, DATE, tmp_path)
+    assert not resumed.index_stale
+    assert resumed.fetched_venues == resumed.processed_venues == {"V001", "V002"}
+    resumed.add_venue("V003", {})
+    resumed.close()
+
+    again = CheckpointWriter(registry, DATE, tmp_path)
+    assert not again.index_stale
+    assert again.processed_venues == {"V001", "V002", "V003"}
+    again.close()
+
+
+def test_writer_trusts_the_checkpoint_over_the_exports(tmp_path, registry, monkeypatch):
+    monkeypatch.setattr(main, "ARROW", False)
+    place = ShowVenue("V001", "V001", "", "PVR")
+    event = ShowEvent("A [2D | Hindi]", "A", "EGA", "ETA", "2D", "Hindi")
+    writer = CheckpointWriter(registry, DATE, tmp_path)
+    writer.add_venue("V001", {event.movie: [Show(place, event, "10:00 AM", "S1", "", 100, 40, 60, 800000)]})
+    expected = writer.movie_summary
+    writer.close()
+    # a crash after the checkpoint swap but before the exports and the index
+    date_dir = tmp_path / str(DATE)
+    (date_dir / "processed_venues.json").write_text("[]")
+    (date_dir / "movie_summary.json").write_text("[]")
+    os.remove(date_dir / main.RESUME_INDEX)
+
+    resumed = CheckpointWriter(registry, DATE, tmp_path)
+    assert resumed.index_stale
+    assert resumed.processed_venues == {"V001"}
+    assert resumed.movie_summary == expected
+    resumed.close()
@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+import main
+from main import CircuitBreaker, RetryQueue, retry_delay
+
+DATE = 20250905
+
+
+class DeadLetters:
+    def __init__(self):
+        self.venues = {}
+
+    def add_dead_letter(self, venue_code, attempts):
+        self.venues[venue_code] = attempts
+
+
+@pytest.fixture
+def dead_letters(monkeypatch):
+    writer = DeadLetters()
+    monkeypatch.setattr(main, "checkpoints", {DATE: writer})
+    return writer
+
+
+def test_retry_delay_is_capped_full_jitter():
+    random.seed(3)
+    for attempt in range(12):
+        cap = min(main.RETRY_MAX_DELAY, main.RETRY_BASE_DELAY * 2**attempt)
+        assert all(0 <= retry_delay(attempt) <= cap for _ in range(50))
+
+
+def test_items_come_back_in_due_order(dead_letters, monkeypatch):
+    delays = {"V1": 0.0, "V2": -2.0, "V3": -1.0, "V4": 60.0}
+    queue = RetryQueue()
+    for venue_code, delay in delays.items():
+        monkeypatch.setattr(main, "retry_delay", lambda attempt, d=delay: d)
+        queue.push(venue_code, DATE, 1)
+
+    assert len(queue) == 4
+    assert list(queue.pop_due()) == [("V2", DATE, 1), ("V3", DATE, 1), ("V1", DATE, 1)]
+    assert len(queue) == 1
+    assert 59 < queue.next_due_in() <= 60
+    assert not dead_letters.venues
+
+
+def test_last_attempt_goes_to_dead_letters(dead_letters):
+    queue = RetryQueue()
+    queue.push("V1", DATE, main.MAX_ATTEMPTS - 1)
+    queue.push("V2", DATE, main.MAX_ATTEMPTS)
+    assert len(queue) == 1
+    assert dead_letters.venues == {"V2": main.MAX_ATTEMPTS}
+    assert RetryQueue().next_due_in() is None
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.wait_time() == 0
+    breaker.record_failure()
+    assert 29 < breaker.wait_time() <= 30
+
+
+def test_unparseable_body_is_a_failed_attempt(dead_letters, monkeypatch, tmp_path):
+    breaker = CircuitBreaker(threshold=10, cooldown=30)
+    cache = main.ResponseCache(str(tmp_path))
+    key = main.cache_key("V1", DATE)
+    body = b"<html>challenge</html>"
+    cache.store(key, DATE, body)
+    monkeypatch.setattr(main, "breaker", breaker)
+    monkeypatch.setattr(main, "cache", cache)
+    monkeypatch.setattr(main, "pipeline", None)
+
+    assert main.record_result("V1", DATE, body) is False
+    assert breaker.failures == 1
+    assert cache.read(key) is None  # the next fetch stores it afresh
+
+
+def test_later_dates_wait_for_the_earlier_answer(dead_letters, monkeypatch):
+    monkeypatch.setattr(main, "retry_delay", lambda attempt: 0.0)
+    covered, calls = set(), []
+
+    def fetch(venue_code, date_code):
+        if (venue_code, date_code) in covered:  # fetch_venue_safe's is_fetched()
+            return True
+        calls.append((venue_code, date_code))
+        if venue_code == "V1":  # answers with its next show date
+            covered.add((venue_code, date_code + 1))
+        return venue_code != "V3" or date_code != DATE  # V3 never answers DATE
+
+    monkeypatch.setattr(main, "fetch_venue_safe", fetch)
+    main.run_thread_sweep([(v, d) for d in (DATE, DATE + 1) for v in ("V1", "V2", "V3")])
+    assert sorted(set(calls)) == [("V1", DATE), ("V2", DATE), ("V2", DATE + 1), ("V3", DATE), ("V3", DATE + 1)]
+    assert calls.count(("V3", DATE)) == main.MAX_ATTEMPTS
+    assert dead_letters.venues == {"V3": main.MAX_ATTEMPTS}
@@ -0,0 +1,109 @@
+import pytest
+
+from bench import synthetic_dataset
+from main import MovieSummary, Show, ShowDB, ShowTable, VenueRegistry
+
+DATE = 20250905
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return synthetic_dataset(num_venues=40, num_movies=30, num_cities=6, seed=5)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = ShowDB(str(tmp_path / "shows.db"))
+    yield db
+    db.close()
+
+
+def canonical(summary):
+    out = summary.to_json()
+    for data in out.values():
+        data["details"] = sorted(data["details"], key=lambda d: (d["state"], d["city"]))
+        data["Chain_details"] = sorted(data["Chain_details"], key=lambda d: d["chain"])
+    return out
+
+
+def write(db, registry, venues, fetched_at, polled=False):
+    # one checkpoint flush: venues maps venue_code -> movies
+    table = ShowTable()
+    for movies in venues.values():
+        table.append_venue(movies, fetched_at)
+    polled = {code: fetched_at for code in venues} if polled else {}
+    db.write(DATE, table.drain(), list(venues), polled, registry)
+
+
+def resold(movies, sold_delta):
+    return {
+        movie: [
+            Show(s.place, s.event, s.time, s.session_id, s.audi, s.total,
+                 min(s.total, s.sold + sold_delta), max(0, s.available - sold_delta),
+                 s.paise + sold_delta * 10000)
+            for s in shows
+        ]
+        for movie, shows in movies.items()
+    }
+
+
+def session_rows(db, venue_code):
+    return db.conn.execute(
+        "SELECT session_id, sold FROM shows WHERE date_code = ? AND venue_code = ? ORDER BY session_id",
+        (DATE, venue_code),
+    ).fetchall()
+
+
+def test_summary_matches_the_in_memory_aggregate(db, dataset):
+    all_data, venues_info = dataset
+    registry = VenueRegistry.from_venues(venues_info)
+    codes = list(all_data)
+    write(db, registry, {c: all_data[c] for c in codes[:25]}, 1.0)
+    write(db, registry, {c: all_data[c] for c in codes[25:]}, 2.0)
+
+    expected = MovieSummary()
+    for code in codes:
+        expected.add_venue(venues_info[code]["City"], venues_info[code]["State"], all_data[code])
+    assert canonical(db.summary(DATE)) == canonical(expected)
+    assert db.fetched(DATE) == set(codes)
+
+
+def test_upsert_replaces_the_row(db, dataset):
+    all_data, venues_info = dataset
+    registry = VenueRegistry.from_venues(venues_info)
+    write(db, registry, {"V00000": all_data["V00000"]}, 1.0)
+    before = session_rows(db, "V00000")
+    write(db, registry, {"V00000": resold(all_data["V00000"], 1)}, 2.0)
+    after = session_rows(db, "V00000")
+
+    assert [sid for sid, _ in after] == [sid for sid, _ in before]
+    expected = {s.session_id: s.sold for shows in resold(all_data["V00000"], 1).values() for s in shows}
+    assert dict(after) == expected
+
+
+def test_history_only_when_counts_change(db, dataset):
+    all_data, venues_info = dataset
+    registry = VenueRegistry.from_venues(venues_info)
+    movies = all_data["V00001"]
+    show = next(s for shows in movies.values() for s in shows if s.available)
+    write(db, registry, {"V00001": movies}, 1.0)
+    write(db, registry, {"V00001": movies}, 2.0)  # unchanged
+    assert len(db.history(DATE, "V00001", show.session_id)) == 1
+
+    write(db, registry, {"V00001": resold(movies, 1)}, 3.0)
+    assert [t for t, *_ in db.history(DATE, "V00001", show.session_id)] == [1.0, 3.0]
+
+
+def test_poll_drops_sessions_the_venue_no_longer_lists(db, dataset):
+    all_data, venues_info = dataset
+    registry = VenueRegistry.from_venues(venues_info)
+    write(db, registry, {"V00002": all_data["V00002"], "V00003": all_data["V00003"]}, 1.0)
+    kept = dict(all_data["V00002"])
+    kept.pop(next(iter(kept)))
+    write(db, registry, {"V00002": kept}, 2.0, polled=True)
+
+    assert [sid for sid, _ in session_rows(db, "V00002")] == sorted(
+        s.session_id for shows in kept.values() for s in shows
+    )
+    # a venue that was not polled keeps its rows
+    assert len(session_rows(db, "V00003")) == sum(len(s) for s in all_data["V00003"].values())
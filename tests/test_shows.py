@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+import main
+from bench import synthetic_dataset
+from main import ShowTable, compact_parts, load_shows
+
+DATE = 20250905
+
+pytest.importorskip("pyarrow")
+pytest.importorskip("pandas")
+
+
+def sorted_rows(shows):
+    return shows.sort_values(["venue_code", "session_id"]).reset_index(drop=True)
+
+
+def test_compaction_keeps_what_load_shows_returns(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ARROW", True)
+    all_data, _ = synthetic_dataset(num_venues=8, num_movies=30, num_cities=3, seed=3)
+    table = ShowTable()
+    for vcode, movies in all_data.items():
+        table.append_venue(movies, fetched_at=1.0)
+    table.write_part(DATE, base_dir=tmp_path)
+    # later polls: one venue drops a movie, another comes back unchanged
+    polled = dict(all_data["V00000"])
+    dropped = polled.pop(next(iter(polled)))
+    table.append_venue(polled, fetched_at=2.0)
+    table.write_part(DATE, base_dir=tmp_path)
+    table.append_venue(all_data["V00001"], fetched_at=3.0)
+    table.write_part(DATE, base_dir=tmp_path)
+
+    before = load_shows(DATE, base_dir=tmp_path)
+    assert compact_parts(DATE, tmp_path) is not None
+    part_dir = tmp_path / f"date_code={DATE}"
+    assert len(os.listdir(part_dir)) == 1
+    after = load_shows(DATE, base_dir=tmp_path)
+    assert sorted_rows(after).astype(str).equals(sorted_rows(before).astype(str))
+    assert len(after) == sum(len(s) for m in all_data.values() for s in m.values()) - len(dropped)
+
+    # nothing to fold: left alone
+    assert compact_parts(DATE, tmp_path) is None
@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from bench import synthetic_dataset
+from main import MovieSummary, Show, ShowEvent, ShowVenue, merge_summaries
+
+SEED = 7
+TRIALS = 20
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    return synthetic_dataset(num_venues=400, num_cities=60, seed=SEED)
+
+
+def summary_of(dataset, codes, sign=1, summary=None):
+    all_data, venues_info = dataset
+    summary = MovieSummary() if summary is None else summary
+    for vcode in codes:
+        summary.add_venue(venues_info[vcode]["City"], venues_info[vcode]["State"], all_data[vcode], sign=sign)
+    return summary
+
+
+def canonical(summary):
+    # detail lists follow insertion order, which merging is free to change
+    out = summary.to_json()
+    for data in out.values():
+        data["details"] = sorted(data["details"], key=lambda d: (d["state"], d["city"]))
+        data["Chain_details"] = sorted(data["Chain_details"], key=lambda d: d["chain"])
+    return out
+
+
+def partitions(codes, rng):
+    for _ in range(TRIALS):
+        shuffled = rng.sample(codes, len(codes))
+        cuts = sorted(rng.sample(range(1, len(codes)), rng.randint(1, 8)))
+        yield [shuffled[a:b] for a, b in zip([0] + cuts, cuts + [len(codes)])]
+
+
+def test_merge_is_order_independent(dataset):
+    rng = random.Random(SEED)
+    codes = list(dataset[0])
+    whole = canonical(summary_of(dataset, codes))
+    for groups in partitions(codes, rng):
+        parts = [summary_of(dataset, group) for group in groups]
+        rng.shuffle(parts)
+        assert canonical(merge_summaries(parts)) == whole
+
+
+def test_merge_is_associative(dataset):
+    # (a + b) + c == a + (b + c), over random groupings
+    rng = random.Random(SEED)
+    codes = list(dataset[0])
+    whole = canonical(summary_of(dataset, codes))
+    for groups in partitions(codes, rng):
+        parts = [summary_of(dataset, group) for group in groups]
+        while len(parts) > 1:
+            i = rng.randrange(len(parts) - 1)
+            parts[i : i + 2] = [merge_summaries(parts[i : i + 2])]
+        assert canonical(parts[0]) == whole
+
+
+def test_removal_cancels(dataset):
+    rng = random.Random(SEED)
+    codes = list(dataset[0])
+    for groups in partitions(codes, rng):
+        dropped = set(groups[0])
+        rest = summary_of(dataset, dropped, sign=-1, summary=summary_of(dataset, codes))
+        rest.prune()
+        kept = [vcode for vcode in codes if vcode not in dropped]
+        assert canonical(rest) == canonical(summary_of(dataset, kept))
+
+
+def test_merge_with_empty_is_identity(dataset):
+    summary = summary_of(dataset, list(dataset[0])[:50])
+    expected = canonical(summary)
+    assert canonical(MovieSummary().merge(summary)) == expected
+    assert canonical(summary.merge(MovieSummary())) == expected
+
+
+def test_json_round_trip(dataset):
+    summary = summary_of(dataset, list(dataset[0]))
+    assert canonical(MovieSummary.from_json(summary.to_json())) == canonical(summary)
+
+
+def test_derived_fields():
+    place = ShowVenue("V1", "Venue", "", "PVR")
+    event = ShowEvent("Movie [2D | Hindi]", "Movie", "EG1", "ET1", "2D", "Hindi")
+    shows = [
+        Show(place, event, "10:00 AM", "1", "", 100, 98, 2, 98 * 25000),  # housefull
+        Show(place, event, "01:00 PM", "2", "", 100, 50, 50, 50 * 25000),  # fast filling
+        Show(place, event, "04:00 PM", "3", "", 100, 10, 90, 10 * 15050),
+        Show(place, event, "07:00 PM", "4", "", 0, 0, 0, 0),
+    ]
+    summary = MovieSummary()
+    summary.add_venue("Pune", "Maharashtra", {event.movie: shows})
+    summary.add_venue("Mumbai", "Maharashtra", {event.movie: shows[:1]})
+    data = summary.to_json()[event.movie]
+
+    assert data["title"] == "Movie" and data["dimension"] == "2D" and data["language"] == "Hindi"
+    assert data["shows"] == 5
+    assert data["venues"] == 2 and data["cities"] == 2
+    assert data["sold"] == 256 and data["totalSeats"] == 400
+    assert data["gross"] == (2 * 98 * 250) + (50 * 250) + (10 * 150.50)
+    assert data["housefull"] == 2 and data["fastfilling"] == 1
+    assert data["occupancy"] == 64.0
+    assert [d["city"] for d in data["details"]] == ["Pune", "Mumbai"]  # by gross, high to low
+    assert data["Chain_details"] == [
+        {
+            "chain": "PVR",
+            "venues": 2,
+            "shows": 5,
+            "gross": data["gross"],
+            "sold": 256,
+            "totalSeats": 400,
+            "fastfilling": 1,
+            "housefull": 2,
+            "occupancy": 64.0,
+        }
+    ]
+
+
+def test_remove_venue_prunes_empty_buckets():
+    place = ShowVenue("V1", "Venue", "", "INOX")
+    event = ShowEvent("Movie", "Movie", "EG1", "ET1", "", "")
+    movies = {event.movie: [Show(place, event, "10:00 AM", "1", "", 100, 40, 60, 40 * 20000)]}
+    summary = MovieSummary()
+    summary.add_venue("Pune", "Maharashtra", movies)
+    summary.remove_venue("Pune", "Maharashtra", movies)
+    assert summary.to_json() == {}
+    assert not summary.cities and not summary.chains and not summary.meta